@@ -1,17 +1,37 @@
 import tkinter as tk
 from tkinter import filedialog
-import ttkbootstrap as ttk
-import ttkbootstrap.dialogs
-import tksheet
 
 import sys
 import urllib.error
-import urllib3
+import urllib.parse
 import platform
 import threading
+import functools
+import importlib
+import itertools
+import contextlib
+import queue
+import multiprocessing
+import concurrent.futures
+import argparse
+import abc
+import array
+import csv
 import math
 import os
-import requests
+import re
+import shutil
+import tempfile
+import warnings
+import statistics
+import mmap
+import locale
+import collections
+import codecs
+import time
+import random
+import json
+import sqlite3
 
 
 # ----------------------------------------
@@ -40,411 +60,2762 @@ import requests
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+# ----------------------------------------
+# --------- lazy import functions --------
+# ----------------------------------------
+
+# ttkbootstrap, tksheet, requests (with urllib3) and numpy
+# make up most of the start up time, so each is imported
+# the first time it is needed instead of at the top
+
+# import the window libraries; only the ui needs them
+def load_gui():
+    global ttk, tksheet
+
+    if ttk is None:
+        import ttkbootstrap as ttk
+        import ttkbootstrap.dialogs
+        import tksheet
+
+
+# import the libraries used to download item pages
+def load_network():
+    global requests, urllib3
+
+    if requests is None:
+        import urllib3
+        import requests
+
+        # pages are fetched without verifying the site's
+        # certificate, so silence the warning for each one
+        urllib3.disable_warnings()
+
+
+# import numpy if it is installed; returns None if it
+# isn't, in which case prices are calculated one item at
+# a time in pure python
+def load_numpy():
+    global numpy, numpy_checked
+
+    if not numpy_checked:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+
+        numpy_checked = True
+
+    return numpy
+
+
+# ----------------------------------------
+# ------------ trace functions -----------
+# ----------------------------------------
+
+# record a timed span for the current thread; the yielded
+# args dict can be filled in (e.g. with bytes) before the
+# span ends, and is included in the exported trace; a span
+# that starts while tracing is off is never recorded, even
+# if tracing is back on by the time it ends
+@contextlib.contextmanager
+def trace_span(name, category, **args):
+    start = time.perf_counter()
+    recording = trace_enabled
+
+    try:
+        yield args
+    finally:
+        end = time.perf_counter()
+
+        with trace_lock:
+            if recording and trace_enabled:
+                trace_spans.append((name, category, start, end, threading.get_ident(), args))
+
+
+# decorator that records a span named after the function
+# every time it is called
+def traced(category):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with trace_span(func.__name__, category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# add amount to a named trace counter, such as cache hits
+def count_trace(name, amount=1):
+    with trace_lock:
+        if trace_enabled:
+            trace_counters[name] = trace_counters.get(name, 0) + amount
+
+
+# stop or restart recording spans and counters; background
+# prefetches run untraced, so the trace keeps describing
+# the user's last import
+def enable_trace(enabled):
+    global trace_enabled
+
+    with trace_lock:
+        trace_enabled = enabled
+
+
+# forget all spans and counters; called as each import starts
+def reset_trace():
+    global trace_origin
+
+    with trace_lock:
+        trace_spans.clear()
+        trace_counters.clear()
+        trace_origin = time.perf_counter()
+
+
+# take the q percentile (0 to 1) of a sorted list of numbers
+def percentile(sorted_values, q):
+    if len(sorted_values) < 1:
+        return 0.0
+
+    return sorted_values[min(len(sorted_values) - 1, math.ceil(q * len(sorted_values)) - 1)]
+
+
+# summarize the recorded spans: fetch latency percentiles,
+# bytes downloaded, cache hits and total seconds per span
+# name (summed over all threads)
+def trace_summary():
+    with trace_lock:
+        spans = list(trace_spans)
+        counters = dict(trace_counters)
+
+    fetch_times = sorted(end - start for name, category, start, end, thread, args in spans
+                         if name == 'scrape_page')
+    span_seconds = {}
+
+    for name, category, start, end, thread, args in spans:
+        span_seconds[name] = span_seconds.get(name, 0.0) + end - start
+
+    return {'fetches': len(fetch_times),
+            'fetch_p50': percentile(fetch_times, 0.5),
+            'fetch_p95': percentile(fetch_times, 0.95),
+            'bytes': sum(args.get('bytes', 0) for name, category, start, end, thread, args in spans),
+            'cache_hits': counters.get('cache_hits', 0),
+            'offline_hits': counters.get('offline_hits', 0),
+            'retries': counters.get('retries', 0),
+            'request_rate': rate_limiter.rate if rate_limiter is not None else 0.0,
+            'hedges': counters.get('hedges', 0),
+            'hedge_wins': counters.get('hedge_wins', 0),
+            'errors': counters.get('errors', 0),
+            'span_seconds': span_seconds}
+
+
+# turn a trace summary into a single line of text
+def format_trace_summary(summary):
+    return (f'{summary["fetches"]} fetched (p50 {summary["fetch_p50"]:.2f}s, '
+            f'p95 {summary["fetch_p95"]:.2f}s), {summary["bytes"] / 1024:,.0f} KB, '
+            f'{summary["cache_hits"]} cached, {summary["offline_hits"]} from dump, {summary["retries"]} retried, '
+            f'{summary["hedges"]} hedged, {summary["errors"]} failed, {summary["request_rate"]:.1f} req/s')
+
+
+# write the recorded spans as a chrome trace (json) file,
+# which can be opened in chrome://tracing or perfetto
+def export_trace(path):
+    with trace_lock:
+        spans = list(trace_spans)
+        origin = trace_origin
+
+    events = [{'name': name, 'cat': category, 'ph': 'X', 'pid': os.getpid(), 'tid': thread,
+               'ts': round((start - origin) * 1000000), 'dur': round((end - start) * 1000000),
+               'args': args}
+              for name, category, start, end, thread, args in spans]
+
+    with open(path, 'w') as file:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms',
+                   'otherData': {'summary': trace_summary()}}, file)
+
+
+# ask where to save the trace of the last import, then save it
+def save_trace():
+    file_path = filedialog.asksaveasfilename(title='Export Trace', defaultextension='.json',
+                                             filetypes=[('Chrome trace', '*.json')])
+
+    if file_path:
+        export_trace(file_path)
+
+
 # ----------------------------------------
 # ----------- import functions -----------
 # ----------------------------------------
 
 
-# obtain item list and get prices to populate in sheet
-def import_items():
-    clear_form()
-    if check_file(inventory_path):
-        item_list = build_item_list()
+# obtain item list and get prices to populate in sheet;
+# force_refresh skips the price cache and rescrapes every item,
+# incremental only scrapes items that changed since last import
+def import_items(force_refresh=False, incremental=False):
+    clear_form()
+    reset_trace()
+    aggregate_mules.clear()
+    cancel_event.clear()
+    if check_file(inventory_path):
+        item_list = build_item_list()
+        restored_list = []
+        scrape_list = item_list
+
+        # update total items field with the number of items to import
+        tot_items.set(str(len(item_list)))
+
+        # in incremental mode, rows for unchanged items are restored
+        # straight from the last import, and only the rest are scraped
+        if incremental:
+            restored_list, scrape_list = diff_last_import(item_list)
+            insert_sheet_rows([[item[0], item[1], item[2], False] for item in restored_list])
+
+        # turn off ui buttons so user cannot click until finished
+        disable_ui()
+
+        # start a thread so that sheet can be updated while importing items
+        # this acts as a sort of progress bar
+        thread = threading.Thread(target=lambda: run_import(item_list, restored_list, scrape_list, force_refresh))
+        thread.start()
+
+        set_sheet_columns()
+    else:
+        show_app_info('Zeal outputfile specified does not exist.\n'
+                      'Please check in settings and try again.',
+                      'Missing File', 'error')
+
+
+# price the items that need scraping, then record the
+# whole import so the next incremental import can diff
+# against it; runs on the import thread, checkpointing
+# each price so a cancelled or crashed import can resume
+def run_import(item_list, restored_list, scrape_list, force_refresh):
+    try:
+        with pause_prefetch(), open_checkpoint(item_list, restored_list, force_refresh) as checkpoint:
+            price_list = build_price_list(scrape_list, force_refresh, len(restored_list), checkpoint)
+    finally:
+        # turn the ui buttons back on once the queued rows are in
+        post_ui('enable_ui')
+
+    # keep the checkpoint of a cancelled import, to resume later
+    if any(item is None for item in price_list):
+        priced = len(restored_list) + sum(1 for item in price_list if item is not None)
+        post_ui('summary', f'Import cancelled after {priced} of {len(item_list)} items; '
+                           f'use File > Resume Import to finish it.')
+        return
+
+    priced_at = time.time()
+
+    # map each item to its price row, restored rows keeping
+    # the time they were originally priced
+    rows = {(item[0], item[1]): item for item in restored_list}
+
+    for item in price_list:
+        rows[(item[0], item[1])] = [item[0], item[1], item[2], priced_at]
+
+    save_last_import([rows[(item[0], item[1])] for item in item_list])
+    remove_checkpoint()
+
+    # show where the time went
+    post_ui('summary', format_trace_summary(trace_summary()))
+
+
+# ask for several mules' zeal outputfiles and import the
+# items of all of them into the sheet at once, scraping
+# each item only once however many mules hold it; Save
+# then writes each mule's own items into its ini file
+def import_aggregate():
+    file_paths = filedialog.askopenfilenames(title='Select Outputfiles',
+                                             filetypes=[('Text files', '*Inventory.txt')])
+
+    if not file_paths:
+        return
+
+    jobs, missing = build_aggregate_jobs(file_paths)
+
+    if len(missing) > 0:
+        show_app_info('No mule ini file was found for:\n' + '\n'.join(missing) +
+                      '\nThese mules will be skipped.', 'Missing File', 'warning')
+
+    if len(jobs) < 1:
+        return
+
+    clear_form()
+    reset_trace()
+    aggregate_mules.clear()
+    cancel_event.clear()
+    unique_items = {}
+    total_items = 0
+
+    for job in jobs:
+        item_list = build_item_list(job[0])
+        aggregate_mules.append([job[1], item_list])
+        total_items += len(item_list)
+        unique_items.update(dict.fromkeys((item[0], item[1]) for item in item_list))
+
+    tot_items.set(str(len(unique_items)))
+    disable_ui()
+
+    # start a thread so that sheet can be updated while importing items
+    thread = threading.Thread(target=lambda: run_aggregate_import([list(item) for item in unique_items],
+                                                                 len(jobs), total_items))
+    thread.start()
+
+    set_sheet_columns()
+
+
+# price the unique items of an aggregate import; runs on
+# the import thread
+def run_aggregate_import(item_list, mule_count, total_items):
+    try:
+        with pause_prefetch():
+            price_list = build_price_list(item_list)
+    finally:
+        # turn the ui buttons back on once the queued rows are in
+        post_ui('enable_ui')
+
+    if any(item is None for item in price_list):
+        post_ui('summary', 'Import cancelled; Save writes only the items priced so far.')
+        return
+
+    # show the overlap between the mules, and where the time went
+    post_ui('summary', f'{mule_count} mules, {total_items} items, {len(item_list)} unique; '
+                       f'{format_trace_summary(trace_summary())}')
+
+
+# pair each outputfile with its mule's ini file, using the
+# settings' page and button; returns the jobs and the
+# outputfiles with no ini file
+def build_aggregate_jobs(file_paths):
+    jobs = []
+    missing = []
+
+    for file_path in file_paths:
+        ini_path = find_mule_ini(file_path)
+
+        if ini_path is None:
+            missing.append(os.path.basename(file_path))
+        else:
+            jobs.append([file_path, ini_path, hotkey_page, hotkey_button])
+
+    return jobs, missing
+
+
+# find the ini file of the character whose outputfile this
+# is (Name-Inventory.txt goes with Name_pq.proj.ini), next
+# to the outputfile or next to the mule ini in settings;
+# returns None if there isn't one
+def find_mule_ini(outputfile):
+    character = os.path.basename(outputfile).split('-')[0]
+    folders = [os.path.dirname(os.path.abspath(outputfile))]
+
+    if character_path:
+        folders.append(os.path.dirname(os.path.abspath(character_path)))
+
+    for folder in folders:
+        ini_path = os.path.join(folder, f'{character}_pq.proj.ini')
+
+        if check_file(ini_path):
+            return ini_path
+
+    return None
+
+
+# read in user's zeal outputfile and built list of items;
+# path defaults to the outputfile in settings
+def build_item_list(path=None):
+    if path is None:
+        path = inventory_path
+
+    # key each item on its name and id; dict keys keep their
+    # insertion order, so this drops duplicates in one pass
+    # while keeping the inventory order
+    unique_items = dict.fromkeys((record.name, record.id) for record in parse_outputfile(path))
+
+    return [[name, item_id] for name, item_id in unique_items]
+
+
+# stream a zeal outputfile and yield a record for every line
+# that passes the filters; large files (such as bank dumps)
+# are memory-mapped instead of read through a file buffer
+def parse_outputfile(path):
+    with open(path, 'rb') as file:
+        file_size = os.fstat(file.fileno()).st_size
+
+        if file_size == 0:
+            return
+
+        if file_size < MMAP_THRESHOLD:
+            yield from parse_inventory_lines(file)
+        else:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                yield from parse_inventory_lines(iter(data.readline, b''))
+
+
+# turn raw outputfile lines into typed inventory records,
+# filtering out everything that should not be sold
+def parse_inventory_lines(lines):
+    encoding = locale.getpreferredencoding(False)
+
+    for line in lines:
+        fields = line.decode(encoding, errors='replace').rstrip('\r\n').split('\t')
+
+        # skip blank or malformed lines
+        if len(fields) < 5:
+            continue
+
+        location, name, item_id, count, slots = fields[:5]
+
+        # filter out the header, bank slots, currency and empty slots,
+        # items that can't be sold, and items the user excluded
+        if location == 'Location' or location[:4] == 'Bank' or name == 'Currency' or name == 'Empty':
+            continue
+
+        if name[:4] in UNSELLABLE_PREFIXES or check_exclusion(name):
+            continue
+
+        try:
+            record = InventoryRecord(location, name, int(item_id), int(count), int(slots))
+        except ValueError:
+            continue
+
+        # containers (anything with slots) are not sold
+        if record.slots < 1:
+            yield record
+
+
+# get prices for each item from eq tunnel auctions web site;
+# completed is the number of items already shown in the sheet,
+# and each price is also written to checkpoint, if given; the
+# Cancel button stops the import, leaving the rows of items
+# not yet priced as None
+def build_price_list(def_item_list, force_refresh=False, completed=0, checkpoint=None):
+    # queue each price for the sheet as soon as it arrives;
+    # this runs off the Tk thread, so pump_ui applies it
+    def show_price(item):
+        nonlocal completed
+
+        completed += 1
+        post_ui('row', [item[0], item[1], item[2], False])
+        post_ui('progress', completed)
+
+        if checkpoint is not None:
+            write_checkpoint(checkpoint, item)
+
+    def_price_list = price_items(def_item_list, force_refresh, show_price, cancel_event)
+
+    # keep the price cache within its size limit
+    trim_cache()
+
+    return def_price_list
+
+
+# price every item in the list, without touching the UI;
+# on_price (if given) is called with each [name, id, price]
+# row as it finishes, and the returned list keeps the
+# order of the item list; once cancel (a threading.Event)
+# is set, no more items are scraped and the rows of the
+# items left are None; with quiet set, scrape errors are
+# not reported, and with wait set, scrapes already running
+# when it stops are finished before it returns
+def price_items(def_item_list, force_refresh=False, on_price=None, cancel=None, quiet=False, wait=False):
+    # background prefetches price quietly, without dialogs
+    report = show_app_info if not quiet else lambda *args: None
+    # pre-size the price list so results can be stored by
+    # inventory index, no matter which order they finish in
+    def_price_list = [None] * len(def_item_list)
+    scrape_indexes = range(len(def_item_list))
+    # each item's catalog entry, for its url slug
+    entries = catalog_entries(def_item_list)
+
+    # store an item's price in the master price list at its
+    # original position, so the final list keeps inventory
+    # order
+    def store_price(index, price):
+        def_price_list[index] = [def_item_list[index][0], def_item_list[index][1], price]
+
+        if on_price is not None:
+            on_price(def_price_list[index])
+
+    # price every item with fresh cached auction data in one
+    # batch, without any network I/O
+    if not force_refresh:
+        cached_lists = cache_get_many([item_plus_id[0] for item_plus_id in def_item_list])
+        cached_indexes = [index for index, item_plus_id in enumerate(def_item_list)
+                          if item_plus_id[0] in cached_lists]
+        cached_prices = calculate_prices([cached_lists[def_item_list[index][0]] for index in cached_indexes])
+        count_trace('cache_hits', len(cached_indexes))
+        scrape_indexes = [index for index, item_plus_id in enumerate(def_item_list)
+                          if item_plus_id[0] not in cached_lists]
+
+        for index, price in zip(cached_indexes, cached_prices):
+            store_price(index, price)
+
+        # then price whatever a loaded price dump covers the
+        # same way, leaving only the rest to be scraped
+        offline_lists = offline_get_many([def_item_list[index][0] for index in scrape_indexes])
+        offline_indexes = [index for index in scrape_indexes if def_item_list[index][0] in offline_lists]
+        offline_prices = calculate_prices([offline_lists[def_item_list[index][0]] for index in offline_indexes])
+        count_trace('offline_hits', len(offline_indexes))
+        scrape_indexes = [index for index in scrape_indexes if def_item_list[index][0] not in offline_lists]
+
+        for index, price in zip(offline_indexes, offline_prices):
+            store_price(index, price)
+
+    # the error handling below names requests' exceptions
+    if len(scrape_indexes) > 0:
+        load_network()
+
+    # scrape the remaining item pages in a bounded pool of worker
+    # threads; the futures dict maps each pending scrape back to
+    # its position in the item list
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=setting_as_int(scrape_workers, 4))
+    futures = {executor.submit(fetch_auctions, def_item_list[index][0], entries[index].slug): index
+               for index in scrape_indexes}
+    deadline = setting_as_float(import_deadline, 0.0)
+
+    try:
+        # handle each result as soon as it arrives, giving up on
+        # whatever is left once the import deadline has passed
+        for future in concurrent.futures.as_completed(futures, timeout=deadline if deadline > 0 else None):
+            if cancel is not None and cancel.is_set():
+                break
+
+            index = futures[future]
+            item_plus_id = def_item_list[index]
+            price = 'unknown'
+
+            try:
+                price = calculate_price(future.result())
+            except requests.exceptions.ReadTimeout as error:
+                count_trace('errors')
+                report(f'ReadTimeout error encountered: {error}\nContinuing to scan...',
+                       'ReadTimeout Error', 'error')
+            except SiteBusyError as error:
+                count_trace('errors')
+                report(f'Site busy error encountered: {error}\nContinuing to scan...',
+                       'Site Busy Error', 'error')
+            except requests.exceptions.ConnectionError as error:
+                count_trace('errors')
+                report(f'Connection error encountered: {error}\nContinuing to scan...',
+                       'Connection Error', 'error')
+            except urllib.error.HTTPError as error:
+                count_trace('errors')
+                report(f'HTTP error encountered: {error}\nContinuing to scan...',
+                       'HTTP Error', 'error')
+            except urllib.error.URLError as error:
+                count_trace('errors')
+                report(f'URL SSL error encountered: {error}\nContinuing to scan...',
+                       'URL Error', 'error')
+            except requests.exceptions.RequestException as error:
+                count_trace('errors')
+                report(f'Request error encountered: {error}\nContinuing to scan...',
+                       'Request Error', 'error')
+            except Exception as error:
+                # anything else (such as malformed page data) only
+                # costs this item its price, not the whole import
+                count_trace('errors')
+                report(f'Error pricing {item_plus_id[0]}: {error!r}\nContinuing to scan...',
+                       'Pricing Error', 'error')
+
+            store_price(index, price)
+    except concurrent.futures.TimeoutError:
+        unfinished = [index for index in futures.values() if def_price_list[index] is None]
+
+        for index in unfinished:
+            store_price(index, 'unknown')
+
+        report(f'Import deadline of {deadline:g} seconds reached.\n'
+               f'{len(unfinished)} item(s) were not priced.', 'Import Deadline', 'warning')
+    finally:
+        # don't start scrapes that haven't begun; any still running
+        # finish in the background, bounded by their timeouts,
+        # unless the caller waits for them
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+    catalog_record_prices(def_price_list)
+
+    return def_price_list
+
+
+# get a single item's auction history from the price
+# sources and remember it in the cache; runs inside the
+# worker pool of price_items and returns the auction list
+# (or, from the site, the item's auction window)
+def fetch_auctions(item_name, slug=None):
+    with trace_span('fetch_auctions', 'fetch', item=item_name):
+        auctions = fetch_from_sources(item_name, slug)
+        cache_put(item_name, auctions.auction_list if isinstance(auctions, AuctionWindow) else auctions)
+
+    return auctions
+
+
+# scrape a single item's page and merge the new auctions
+# into its history; returns the item's auction window
+def scrape_auctions(item_name, slug=None):
+    return merge_auction_history(item_name, scrape_page(build_item_url(item_name, slug)))
+
+
+# build the eq tunnel auctions url for an item name, or
+# for its already encoded slug from the catalog
+def build_item_url(item_name, slug=None):
+    if slug is None:
+        slug = encode_item_name(item_name)
+
+    return f'{AUCTION_SITE}/item.php?itemstr={slug}'
+
+
+# encode an item name the way eq tunnel auctions expects
+# it in an item url
+def encode_item_name(item_name):
+    # split item into individual words
+    words = item_name.split()
+    # count the words
+    num_words = len(words)
+    item_string = ''
+
+    # take the individual words of the item name, and
+    # append them together with plus symbols between
+    for i in range(num_words):
+        if i == 0:
+            item_string = f'{words[i]}'
+
+            # if this is a spell, insert character code
+            # for a colon
+            if words[i][5:] == 'Spell':
+                item_string = item_string + '%3A'
+        else:
+            item_string = item_string + f'+{words[i]}'
+
+    return item_string
+
+
+# take in a url string, scrap html code from page, and
+# return the raw text of its list of previous auctions
+@traced('fetch')
+def scrape_page(url):
+    # downloads go through the rate limiter, which paces
+    # them and retries the ones the site turns away
+    return find_auction_data(get_rate_limiter().run(hedged_download, url))
+
+
+# download a page; if hedging is on and the download takes
+# longer than the p95 of recent downloads, fire a duplicate
+# request and return whichever answer arrives first
+def hedged_download(url):
+    hedge_after = hedge_delay()
+
+    if hedge_after is None:
+        return timed_download(url)
+
+    executor = get_hedge_executor()
+    first = executor.submit(timed_download, url)
+    done, pending = concurrent.futures.wait([first], timeout=hedge_after)
+
+    if len(done) < 1:
+        count_trace('hedges')
+        pending.add(executor.submit(timed_download, url))
+
+    # return the first download that succeeds; if both fail,
+    # raise the error of the last one to finish
+    while True:
+        for future in done:
+            if future.exception() is None:
+                if future is not first:
+                    count_trace('hedge_wins')
+
+                return future.result()
+
+        if len(pending) < 1:
+            raise future.exception()
+
+        done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+
+
+# download a page and remember how long it took, for the
+# hedging delay
+def timed_download(url):
+    start = time.monotonic()
+    html = download_page(url)
+
+    with hedge_lock:
+        fetch_latencies.append(time.monotonic() - start)
+
+    return html
+
+
+# return how long to wait before hedging a download (the p95
+# of recent downloads), or None if hedging is off or there
+# are too few downloads yet to know
+def hedge_delay():
+    if hedged_fetch != '1':
+        return None
+
+    with hedge_lock:
+        latencies = sorted(fetch_latencies)
+
+    if len(latencies) < HEDGE_MIN_SAMPLES:
+        return None
+
+    return percentile(latencies, 0.95)
+
+
+# get the pool that runs hedged downloads, creating it on
+# first use; it holds two downloads for each worker
+def get_hedge_executor():
+    global hedge_executor
+
+    with hedge_lock:
+        if hedge_executor is None:
+            hedge_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=setting_as_int(scrape_workers, 4) * 2)
+
+    return hedge_executor
+
+
+# download an item page and return its html
+def download_page(url):
+    # unless streaming is turned off, only read as much
+    # of the page as it takes to find the auction data
+    if stream_fetch != '0':
+        return stream_page(url)
+
+    # open web page, read in the html, and translate into text
+    with trace_span('download', 'fetch') as span:
+        page = requests.get(url, verify=False, timeout=request_timeouts())
+        check_response(page)
+        span['bytes'] = len(page.content)
+
+    return page.text
+
+
+# return the (connect, read) timeouts for a request; the read
+# timeout is the longest wait for any single chunk of data
+def request_timeouts():
+    return (setting_as_float(connect_timeout, 5.0, 0.1), setting_as_float(read_timeout, 20.0, 0.1))
+
+
+# raise SiteBusyError if the site answered with 429 (too
+# many requests) or a 5xx server error
+def check_response(page):
+    if page.status_code == 429 or page.status_code >= 500:
+        try:
+            retry_after = float(page.headers.get('Retry-After', ''))
+        except ValueError:
+            retry_after = None
+
+        raise SiteBusyError(page.status_code, retry_after)
+
+
+# read a web page in chunks, stopping as soon as the first
+# data array has been seen, and return just that slice of
+# the html (or whatever was read if it was never found)
+def stream_page(url):
+    # the wait for the response headers covers dns,
+    # connecting, tls and the server's own time
+    with trace_span('connect', 'fetch'):
+        page = requests.get(url, verify=False, stream=True, timeout=request_timeouts())
+
+    with page, trace_span('download', 'fetch', bytes=0) as span:
+        check_response(page)
+        decoder = codecs.getincrementaldecoder(page.encoding or 'utf-8')(errors='replace')
+        html = ''
+        data_found = False
+
+        for chunk in page.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            span['bytes'] += len(chunk)
+            html = html + decoder.decode(chunk)
+
+            if not data_found:
+                data_start = html.find('data: [')
+
+                # if the start point isn't here yet, only keep enough of
+                # the tail to catch a start marker split across chunks
+                if data_start == -1:
+                    html = html[-(len('data: [') - 1):]
+                    continue
+
+                html = html[data_start:]
+                data_found = True
+
+            # once the end point has arrived, stop reading; leaving
+            # the with block closes the connection
+            if html.find('],', len('data: [')) != -1:
+                break
+
+    return html
+
+
+# take in the html (or a slice of it) from an item page
+# and return the raw text of its list of previous auctions,
+# or None if the page has no list
+def find_auction_data(html):
+    # look for the  start of the list of previous auctions
+    data_start = html.find("data: [")
+
+    if data_start == -1:
+        return None
+
+    # look for the end point, and slice out the string
+    # of prices from the html code
+    data_end = html.find('],', data_start)
+
+    return html[data_start + 7:data_end]
+
+
+# take in a list of numbers (or an item's auction window)
+# and calculate a price based on user settings
+def calculate_price(def_auction_list):
+    if isinstance(def_auction_list, AuctionWindow):
+        return def_auction_list.price()
+
+    return calculate_prices([def_auction_list])[0]
+
+
+# take in many lists of numbers and calculate a price for
+# each, using the first auctions_count numbers of each list
+# and the user's price method; lists with no numbers, or
+# with entries that aren't numbers, are priced as 'unknown'
+@traced('pricing')
+def calculate_prices(auction_lists):
+    divisor = setting_as_int(auctions_count, 15)
+    method = price_method if price_method in PRICE_METHODS else 'mean'
+    auction_lists = [auction_numbers(auction_list, divisor) for auction_list in auction_lists]
+
+    if load_numpy() is None:
+        return [price_auctions(auction_list, method) for auction_list in auction_lists]
+
+    # convert every list to numbers in a single pass, then lay them
+    # out in a matrix with one row per list, padding short rows
+    # with nan so they are ignored by the nan-aware functions
+    counts = numpy.array([min(len(auction_list), divisor) for auction_list in auction_lists], dtype=int)
+    values = numpy.array([price for auction_list in auction_lists for price in auction_list[:divisor]],
+                         dtype=float)
+    prices = numpy.full((len(auction_lists), divisor), numpy.nan)
+    prices[numpy.arange(divisor) < counts[:, None]] = values
+
+    # every method other than mean works on sorted rows;
+    # nan sorts last, so each row's prices stay in front
+    if method != 'mean':
+        prices = numpy.sort(prices, axis=1)
+
+    # silence warnings for rows that are all nan; those
+    # rows are reported as unknown below
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+
+        match method:
+            case 'median':
+                averages = row_quantile(prices, counts, 0.5)
+            case 'trimmed':
+                # drop the same share of prices from both ends
+                trim = numpy.floor(counts * TRIM_FRACTION)[:, None]
+                columns = numpy.arange(divisor)
+                keep = (columns >= trim) & (columns < counts[:, None] - trim)
+                averages = numpy.nanmean(numpy.where(keep, prices, numpy.nan), axis=1)
+            case 'filtered':
+                # drop prices outside of the interquartile fences
+                lower = row_quantile(prices, counts, 0.25)
+                upper = row_quantile(prices, counts, 0.75)
+                fence = (upper - lower) * OUTLIER_FENCE
+                keep = (prices >= (lower - fence)[:, None]) & (prices <= (upper + fence)[:, None])
+                averages = numpy.nanmean(numpy.where(keep, prices, numpy.nan), axis=1)
+            case _:
+                averages = numpy.nanmean(prices, axis=1)
+
+    # drop any fraction, then round up to the nearest multiple of 50
+    rounded = round_to_50(numpy.floor(averages))
+
+    return [int(price) if count > 0 else 'unknown' for price, count in zip(rounded, counts)]
+
+
+# convert the first count entries of an auction list to
+# ints; returns an empty list if any of them isn't a whole
+# number, so one bad list is priced as 'unknown' instead of
+# failing the whole batch
+def auction_numbers(auction_list, count):
+    try:
+        return [int(price) for price in auction_list[:count]]
+    except (TypeError, ValueError):
+        return []
+
+
+# take the q quantile of each row of a sorted price matrix,
+# interpolating between neighbours like numpy.quantile, but
+# using each row's own count instead of scanning for nan
+def row_quantile(sorted_prices, counts, q):
+    rows = numpy.arange(len(counts))
+    position = numpy.maximum(counts - 1, 0) * q
+    lower = numpy.floor(position).astype(int)
+    upper = numpy.ceil(position).astype(int)
+    low_prices = sorted_prices[rows, lower]
+
+    return low_prices + (sorted_prices[rows, upper] - low_prices) * (position - lower)
+
+
+# price a single list of numbers without numpy, using the
+# same methods as calculate_prices
+def price_auctions(def_auction_list, method):
+    prices = sorted(int(price) for price in def_auction_list)
+
+    if len(prices) < 1:
+        return 'unknown'
+
+    match method:
+        case 'median':
+            average = statistics.median(prices)
+        case 'trimmed':
+            trim = math.floor(len(prices) * TRIM_FRACTION)
+            average = statistics.mean(prices[trim:len(prices) - trim])
+        case 'filtered':
+            if len(prices) > 1:
+                lower, _, upper = statistics.quantiles(prices, n=4, method='inclusive')
+            else:
+                lower = upper = prices[0]
+
+            fence = (upper - lower) * OUTLIER_FENCE
+            average = statistics.mean(price for price in prices if lower - fence <= price <= upper + fence)
+        case _:
+            average = statistics.mean(prices)
+
+    # drop any fraction, then round up to the nearest multiple of 50
+    return round_to_50(math.floor(average))
+
+
+# take in a number (or an array of numbers) and ceiling
+# it up to the nearest multiple of 50
+def round_to_50(num, base=50):
+    if numpy is not None and isinstance(num, numpy.ndarray):
+        return base * numpy.ceil(num / base)
+
+    return base * math.ceil(num / base)
+
+
+# ----------------------------------------
+# ---------- item table functions --------
+# ----------------------------------------
+
+# a table of items stored by column instead of as a list
+# per item: names in a list, ids and prices in typed arrays
+# (with UNKNOWN_PRICE for items with no price) and exclude
+# flags in a bytearray; iterating it gives (name, id,
+# price, excluded) rows, with 'unknown' for missing prices
+class ItemTable:
+    __slots__ = ('names', 'ids', 'prices', 'excluded')
+
+    def __init__(self):
+        self.names = []
+        self.ids = array.array('q')
+        self.prices = array.array('q')
+        self.excluded = bytearray()
+
+    # build a table from [name, id], [name, id, price] or
+    # [name, id, price, excluded] rows, such as the sheet's
+    @classmethod
+    def from_rows(cls, rows):
+        table = cls()
+
+        for row in rows:
+            table.append(row[0], row[1], row[2] if len(row) > 2 else None, len(row) > 3 and row[3] is True)
+
+        return table
+
+    # add an item; ids and prices may be text, as edited in
+    # the sheet, and a price that isn't a number is unknown
+    def append(self, name, item_id, price=None, excluded=False):
+        self.names.append(name)
+        self.ids.append(int(item_id))
+        self.prices.append(parse_price(price))
+        self.excluded.append(1 if excluded else 0)
+
+    # make a new table of the rows at the given indexes
+    def take(self, indexes):
+        table = ItemTable()
+        table.names = [self.names[index] for index in indexes]
+        table.ids = array.array('q', [self.ids[index] for index in indexes])
+        table.prices = array.array('q', [self.prices[index] for index in indexes])
+        table.excluded = bytearray(self.excluded[index] for index in indexes)
+
+        return table
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        for name, item_id, price, excluded in zip(self.names, self.ids, self.prices, self.excluded):
+            yield name, item_id, price if price != UNKNOWN_PRICE else 'unknown', excluded == 1
+
+    # write the table to a csv file, or to a json file of
+    # columns if the path ends in .json
+    def export(self, path):
+        prices = [price if price != UNKNOWN_PRICE else None for price in self.prices]
+
+        if path.lower().endswith('.json'):
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump({'name': self.names, 'id': self.ids.tolist(), 'price': prices,
+                           'excluded': [flag == 1 for flag in self.excluded]}, file)
+        else:
+            with open(path, 'w', newline='', encoding='utf-8') as file:
+                writer = csv.writer(file)
+                writer.writerow(['name', 'id', 'price', 'excluded'])
+                writer.writerows(zip(self.names, self.ids, prices, (flag == 1 for flag in self.excluded)))
+
+
+# turn a price from the pricing code or the sheet into an
+# int, or UNKNOWN_PRICE if it isn't a whole number; whole
+# floats such as 1500.0 count as numbers
+def parse_price(price):
+    if isinstance(price, int) and not isinstance(price, bool):
+        return price
+
+    text = str(price).replace(',', '').strip()
+
+    try:
+        return int(text)
+    except ValueError:
+        pass
+
+    try:
+        number = float(text)
+    except ValueError:
+        return UNKNOWN_PRICE
+
+    return int(number) if number.is_integer() else UNKNOWN_PRICE
+
+
+# find sheet rows that can't go into an ItemTable as they
+# are: ids that aren't numbers, and prices that are neither
+# whole numbers of zero or more nor 'unknown'; returns a
+# line describing each
+def check_sheet_rows(rows):
+    problems = []
+
+    for number, row in enumerate(rows, 1):
+        try:
+            int(str(row[1]).strip())
+        except ValueError:
+            problems.append(f'Row {number} ({row[0]}): item ID "{row[1]}" is not a number.')
+
+        if len(row) > 2 and str(row[2]).strip().lower() != 'unknown' and parse_price(row[2]) < 0:
+            problems.append(f'Row {number} ({row[0]}): price "{row[2]}" is not a whole number or unknown.')
+
+    return problems
+
+
+# show the problems check_sheet_rows found, if any; returns
+# True if the sheet can be used
+def confirm_sheet_rows(rows):
+    problems = check_sheet_rows(rows)
+
+    if len(problems) > 0:
+        shown = problems[:SHEET_PROBLEMS_SHOWN]
+
+        if len(problems) > len(shown):
+            shown.append(f'...and {len(problems) - len(shown)} more.')
+
+        ttk.dialogs.Messagebox.show_error('Please correct these rows and try again:\n' + '\n'.join(shown),
+                                          'Invalid Rows')
+
+    return len(problems) < 1
+
+
+# ask where to export the items in the sheet, then write
+# them as csv or json
+def export_prices():
+    if len(sheet.get_sheet_data()) < 1:
+        ttk.dialogs.Messagebox.show_error('Please import item data first.', 'No Data')
+        return
+
+    file_path = filedialog.asksaveasfilename(title='Export Prices', defaultextension='.csv',
+                                             filetypes=[('CSV', '*.csv'), ('JSON', '*.json')])
+
+    if file_path and confirm_sheet_rows(sheet.get_sheet_data()):
+        ItemTable.from_rows(sheet.get_sheet_data()).export(file_path)
+
+
+# ----------------------------------------
+# ----------- export functions -----------
+# ----------------------------------------
+
+
+# use the contents of the sheet to build a list of items
+# to insert into character ini file
+def build_file_list(price_list):
+    if len(aggregate_mules) < 1 and not check_file(character_path):
+        show_app_info('Character ini file specified does not exist.\n'
+                      'Please check in settings and try again.',
+                      'Missing File', 'warning')
+        return
+
+    # make sure there's data in the sheet first
+    if len(sheet.get_sheet_data()) < 1:
+        ttk.dialogs.Messagebox.show_error('Please import item data first.', 'No Data')
+        return
+
+    # ids and prices can be edited in the sheet
+    if not confirm_sheet_rows(price_list):
+        return
+
+    table = ItemTable.from_rows(price_list)
+
+    # build new item table with only items not
+    # marked for exclusion, so that len of table
+    # is accurate; items marked for exclusion
+    # get added to exclusions list
+    add_exclusions([table.names[index] for index in range(len(table)) if table.excluded[index]])
+    def_table = table.take([index for index in range(len(table)) if not table.excluded[index]])
+
+    buttons = 0
+    saved_buttons = 0
+
+    if len(aggregate_mules) > 0:
+        # after an aggregate import, each mule gets its own
+        # items at the prices in the sheet
+        saved_rows = {(name, item_id): index
+                      for index, (name, item_id) in enumerate(zip(def_table.names, def_table.ids))}
+
+        for mule_ini, item_list in aggregate_mules:
+            mule_table = def_table.take([saved_rows[(item[0], item[1])] for item in item_list
+                                         if (item[0], item[1]) in saved_rows])
+
+            # leave the ini alone if there is nothing to sell
+            if len(mule_table) > 0:
+                mule_buttons = write_macros(mule_table, mule_ini, hotkey_page, hotkey_button)
+                buttons += mule_buttons
+                saved_buttons += unpacked_buttons(len(mule_table)) - mule_buttons
+
+        aggregate_mules.clear()
+    else:
+        # remember any prices the user adjusted in the sheet
+        record_saved_prices(list(def_table))
+
+        # write the macros
+        buttons = write_macros(def_table, character_path, hotkey_page, hotkey_button)
+        saved_buttons = unpacked_buttons(len(def_table)) - buttons
+
+    # long item names can take more buttons than six items
+    # per line did, so only mention savings when there are some
+    if saved_buttons > 0:
+        buttons_used = f'{buttons} button(s) used, {saved_buttons} fewer than at six items per line.'
+    else:
+        buttons_used = f'{buttons} button(s) used.'
+
+    # then clear the sheet and notify user
+    clear_form()
+    show_app_info(f'Auction macro(s) successfully created in .ini file.\n'
+                  f'{buttons_used}\n'
+                  f'Please log into EverQuest to see the changes.',
+                  'Write Successful', 'info')
+
+
+# write auction macros for the items of an ItemTable (or a
+# list of [name, id, price] rows) into an ini file, starting
+# at the given hotkey page and button; returns the number
+# of buttons
+@traced('export')
+def write_macros(def_price_list, ini_path, page, button):
+    if not isinstance(def_price_list, ItemTable):
+        def_price_list = ItemTable.from_rows(def_price_list)
+
+    macro_lines, total_buttons = build_macro_lines(def_price_list, page, button)
+
+    # read in the entire ini file
+    with open(ini_path) as file:
+        file_contents = file.readlines()
+
+    # make sure the last line ends properly before any lines
+    # are added after it
+    if len(file_contents) > 0 and not file_contents[-1].endswith('\n'):
+        file_contents[-1] = file_contents[-1] + '\n'
+
+    socials = find_socials(file_contents)
+
+    # if socials does not already exist in .ini, create it
+    # at the bottom of the file
+    if socials is None:
+        write_line(file_contents, '[Socials]')
+        socials = (len(file_contents), len(file_contents))
+
+    # the buttons being written, plus any auction macros left
+    # right after them from an earlier save that needed more
+    # buttons, so none of their old prices are left behind
+    auction_buttons = set()
+
+    for line in file_contents[socials[0]:socials[1]]:
+        key = AUCTION_NAME_KEY.match(line)
+
+        if key is not None and key.group(1) == str(page):
+            auction_buttons.add(int(key.group(2)))
+
+    last_button = int(button) + total_buttons
+
+    while last_button in auction_buttons:
+        last_button += 1
+
+    macro_buttons = range(int(button), last_button)
+
+    # keep every line of the [Socials] section except the ones
+    # for the buttons being written; those are the lines the
+    # new macros replace, in the place the first of them was
+    kept_lines = []
+    insert_at = None
+
+    for line in file_contents[socials[0]:socials[1]]:
+        key = MACRO_KEY.match(line)
+
+        if key is not None and key.group(1) == str(page) and int(key.group(2)) in macro_buttons:
+            if insert_at is None:
+                insert_at = len(kept_lines)
+        else:
+            kept_lines.append(line)
+
+    # with no old macro to replace, add the new one at the
+    # end of the [Socials] section
+    if insert_at is None:
+        insert_at = len(kept_lines)
+
+        # but keep any blank lines at the end of the section
+        # between it and the next section
+        while insert_at > 0 and kept_lines[insert_at - 1].strip() == '':
+            insert_at -= 1
+
+    new_socials = kept_lines[:insert_at] + macro_lines + kept_lines[insert_at:]
+    new_contents = file_contents[:socials[0]] + new_socials + file_contents[socials[1]:]
+
+    # finally, perform the file write operation, unless
+    # the macros are already exactly as they should be
+    if new_contents != file_contents:
+        write_new_file(new_contents, ini_path)
+
+    return total_buttons
+
+
+# find the [Socials] section in the lines of an ini file;
+# returns (first, end) indexes of the lines after its header
+# and before the next section, or None if it has none
+def find_socials(file_contents):
+    first = None
+
+    for index, line in enumerate(file_contents):
+        if line.strip() == '[Socials]':
+            first = index + 1
+        elif first is not None and line.startswith('['):
+            return first, index
+
+    if first is None:
+        return None
+
+    return first, len(file_contents)
+
+
+# build the ini lines of the auction macros for the
+# [name, id, price] rows of def_price_list, starting at
+# the given hotkey page and button; returns the lines
+# and the number of buttons they fill
+def build_macro_lines(def_price_list, page, button):
+    macro_lines = []
+    # pack the auction text of the items into as few
+    # lines as the line length allows
+    auction_lines = pack_auction_lines([f'{item[1]:06d} {item[0]} {item[2]}' for item in def_price_list],
+                                       setting_as_int(line_length, 255, len(AUCTION_PREFIX) + 1))
+    # each macro holds 5 lines, so ceil the quotient of
+    # the line count and 5
+    total_buttons = math.ceil(len(auction_lines) / LINES_PER_BUTTON)
+
+    for index, auction_line in enumerate(auction_lines):
+        button_num = int(button) + index // LINES_PER_BUTTON
+        line_num = index % LINES_PER_BUTTON + 1
+
+        # if this is a new button, create the name and color lines
+        if line_num == 1:
+            write_line(macro_lines, f'Page{page}Button{button_num}Name=Auction{button_num}')
+            write_line(macro_lines, f'Page{page}Button{button_num}Color=0')
+
+        write_line(macro_lines, f'Page{page}Button{button_num}Line{line_num}={auction_line}')
+
+    return macro_lines, total_buttons
+
+
+# pack item auction texts into '/auction WTS' lines of at
+# most budget characters, as few lines as possible: the
+# longest texts are placed first, each into the first line
+# with room for it (first fit decreasing); a text too long
+# for any line gets a line of its own
+def pack_auction_lines(auction_texts, budget):
+    lines = []
+
+    for auction_text in sorted(auction_texts, key=len, reverse=True):
+        for line in lines:
+            if line[0] + len(', ') + len(auction_text) <= budget:
+                line[0] += len(', ') + len(auction_text)
+                line[1].append(auction_text)
+                break
+        else:
+            lines.append([len(AUCTION_PREFIX) + len(auction_text), [auction_text]])
+
+    return [AUCTION_PREFIX + ', '.join(texts) for length, texts in lines]
+
+
+# the number of buttons the items would take at six items
+# per line, as macros were packed before line lengths were
+# counted; the difference is the buttons packing saved
+def unpacked_buttons(item_count):
+    return math.ceil(item_count / (6 * LINES_PER_BUTTON))
+
+
+# add line parameter, with a newline, to the items list
+def write_line(items, line):
+    line_to_write = line + f'\n'
+    items.append(line_to_write)
+
+    return items
+
+
+# take the file list, with auction macro(s), assembled
+# above and write it to disk, over-writing existing file;
+# the lines go to a temporary file next to it first, which
+# then replaces the ini in one step, so a crash can never
+# leave a half written ini behind
+def write_new_file(file_contents, ini_path):
+    ini_dir = os.path.dirname(os.path.abspath(ini_path))
+    temp_file = tempfile.NamedTemporaryFile('w', dir=ini_dir, prefix='.auction-', suffix='.tmp', delete=False)
+
+    try:
+        with temp_file as file:
+            file.writelines(file_contents)
+            file.flush()
+            os.fsync(file.fileno())
+
+        # the temp file is created private (0600); give it the
+        # ini's own permissions before it takes the ini's place
+        if os.path.exists(ini_path):
+            shutil.copymode(ini_path, temp_file.name)
+
+        os.replace(temp_file.name, ini_path)
+    except BaseException:
+        os.remove(temp_file.name)
+        raise
+
+
+# ----------------------------------------
+# ------------ batch functions -----------
+# ----------------------------------------
+
+# parse the command line for headless batch mode and run
+# it; returns the process exit code
+def run_cli(args):
+    parser = argparse.ArgumentParser(prog='Auction-Builder',
+                                     description='Build auction macros for one or more mules without the UI. '
+                                                 'With no jobs given, the mule in settings is used.')
+    parser.add_argument('--batch', metavar='JOBS_FILE',
+                        help='csv file with one outputfile,mule_ini,page,button job per line')
+    parser.add_argument('--job', nargs=4, action='append', default=[],
+                        metavar=('OUTPUTFILE', 'MULE_INI', 'PAGE', 'BUTTON'), help='add a single job')
+    parser.add_argument('--aggregate', nargs='+', default=[], metavar='OUTPUTFILE',
+                        help="add a job for each outputfile, writing to its character's "
+                             "Name_pq.proj.ini at the page and button in settings")
+    parser.add_argument('--headless', action='store_true',
+                        help='run the mule in settings without the window (the default when no jobs are given)')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='number of worker processes (default: one per cpu)')
+    parser.add_argument('--force-refresh', action='store_true', help='ignore the price cache')
+    parser.add_argument('--trace', metavar='TRACE_FILE', help='save a chrome trace (json) of the run')
+    parser.add_argument('--export', metavar='PRICES_FILE',
+                        help='also save every priced item as csv (or json, if the name ends in .json)')
+    parser.add_argument('--load-dump', metavar='DUMP',
+                        help='load a bulk price dump (json lines or csv file, or a folder of them and '
+                             'saved item pages) before pricing; with no jobs given, only load it')
+    parser.add_argument('--clear-dump', action='store_true', help='empty the loaded price dump first')
+    parser.add_argument('--watch', action='store_true',
+                        help='instead of running jobs, watch the outputfile in settings and prefetch '
+                             'prices whenever it changes (writing macros too if autosave=1), until '
+                             'stopped with Ctrl+C')
+    options = parser.parse_args(args)
+
+    # settings still supply auctions, exclusions and cache options
+    if not load_settings():
+        print('Invalid or missing settings file. Please run Auction Builder once to set it up.',
+              file=sys.stderr)
+        return 2
+
+    check_price_sources()
+    jobs = list(options.job)
+
+    if options.batch is not None:
+        jobs.extend(read_batch_jobs(options.batch))
+
+    if len(options.aggregate) > 0:
+        aggregate_jobs, missing = build_aggregate_jobs(options.aggregate)
+        jobs.extend(aggregate_jobs)
+
+        for outputfile in missing:
+            print(f'No mule ini file found for {outputfile}; skipping it.', file=sys.stderr)
+
+        if len(jobs) < 1:
+            return 1
+
+    if options.clear_dump:
+        clear_price_dump()
+
+    if options.load_dump is not None:
+        try:
+            print(f'{load_price_dump(options.load_dump)} item(s) loaded from {options.load_dump}')
+        except (OSError, ValueError, AttributeError, sqlite3.Error) as error:
+            print(f'Price dump could not be loaded: {error}', file=sys.stderr)
+            return 1
+
+    if options.watch:
+        return run_watch()
+
+    # loading (or clearing) a dump on its own is a complete run
+    if len(jobs) < 1 and (options.load_dump is not None or options.clear_dump):
+        return 0
+
+    if len(jobs) < 1:
+        jobs.append([inventory_path, character_path, hotkey_page, hotkey_button])
+
+    reset_trace()
+    summary = run_batch(jobs, options.force_refresh, options.processes, options.export)
+    print_batch_summary(summary)
+    print(format_trace_summary(trace_summary()))
+
+    if options.trace is not None:
+        export_trace(options.trace)
+
+    # exit with an error if any job failed
+    if any(result['error'] for result in summary):
+        return 1
+
+    return 0
+
+
+# read a csv jobs file, skipping blank lines and
+# lines starting with #
+def read_batch_jobs(jobs_path):
+    jobs = []
+
+    with open(jobs_path, newline='') as file:
+        for row in csv.reader(file):
+            if len(row) < 1 or row[0].strip()[:1] in ('', '#'):
+                continue
+
+            jobs.append([field.strip() for field in row[:4]])
+
+    return jobs
+
+
+# run several (outputfile, mule_ini, page, button) jobs;
+# outputfiles are parsed and ini files written across a
+# process pool, while the prices of all unique items are
+# scraped only once and shared between the jobs; with
+# export_path, the priced items are also exported there
+def run_batch(jobs, force_refresh=False, processes=None, export_path=None):
+    summary = [{'outputfile': job[0], 'mule_ini': job[1], 'items': 0, 'unknown': 0,
+                'buttons': 0, 'saved': 0, 'error': ''} for job in jobs]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes, initializer=load_settings) as pool:
+        # parse every outputfile in parallel
+        parsed_jobs = list(pool.map(parse_batch_job, jobs))
+        unique_items = {}
+
+        for result, (item_list, error) in zip(summary, parsed_jobs):
+            result['error'] = error
+            result['items'] = len(item_list)
+            unique_items.update(dict.fromkeys((item[0], item[1]) for item in item_list))
+
+        # price every unique item once, for all of the jobs
+        price_list = price_items([list(item) for item in unique_items], force_refresh)
+        prices = {(row[0], row[1]): row[2] for row in price_list}
+        trim_cache()
+
+        if export_path is not None:
+            ItemTable.from_rows(price_list).export(export_path)
+
+        # then write every mule's macros in parallel
+        futures = {}
+
+        for index, (job, (item_list, error)) in enumerate(zip(jobs, parsed_jobs)):
+            if error:
+                continue
+
+            price_list = ItemTable.from_rows([item[0], item[1], prices[(item[0], item[1])]] for item in item_list)
+            summary[index]['unknown'] = price_list.prices.count(UNKNOWN_PRICE)
+            futures[pool.submit(write_batch_job, job, price_list)] = index
+
+        for future in concurrent.futures.as_completed(futures):
+            result = summary[futures[future]]
+            result['buttons'], result['error'] = future.result()
+
+            if result['buttons'] > 0:
+                # long item names can need more buttons, which isn't a saving
+                result['saved'] = max(0, unpacked_buttons(result['items']) - result['buttons'])
+
+    return summary
+
+
+# parse one job's outputfile in a worker process;
+# returns the item list and an error message
+def parse_batch_job(job):
+    if len(job) != 4:
+        return [], 'job needs outputfile, mule_ini, page and button'
+
+    if not check_file(job[0]):
+        return [], 'outputfile does not exist'
+
+    if not check_file(job[1]):
+        return [], 'mule ini does not exist'
+
+    if not (str(job[2]).isdigit() and str(job[3]).isdigit()):
+        return [], 'page and button must be numbers'
+
+    try:
+        return build_item_list(job[0]), ''
+    except (OSError, ValueError) as error:
+        return [], str(error)
+
+
+# write one job's macros in a worker process; returns
+# the number of buttons written and an error message
+def write_batch_job(job, price_list):
+    # leave the ini alone if there is nothing to sell
+    if len(price_list) < 1:
+        return 0, ''
+
+    try:
+        return write_macros(price_list, job[1], job[2], job[3]), ''
+    except (OSError, ValueError) as error:
+        return 0, str(error)
+
+
+# print a line per job with its item counts and status
+def print_batch_summary(summary):
+    print(f'{"Outputfile":<40} {"Items":>6} {"Unknown":>8} {"Buttons":>8} {"Saved":>6}  Status')
+
+    for result in summary:
+        status = result['error'] if result['error'] else 'ok'
+        print(f'{os.path.basename(result["outputfile"]):<40} {result["items"]:>6} '
+              f'{result["unknown"]:>8} {result["buttons"]:>8} {result["saved"]:>6}  {status}')
+
+
+# ----------------------------------------
+# ---------- price source functions ------
+# ----------------------------------------
+
+# a place to get auction histories from; subclasses
+# implement fetch, which returns an item's auction list,
+# newest first (empty if the source has no data for it);
+# any error it raises counts as that source failing
+class PriceSource(abc.ABC):
+    def __init__(self, name, argument=''):
+        self.name = name
+        self.argument = argument
+
+    @abc.abstractmethod
+    def fetch(self, item_name, slug=None):
+        pass
+
+
+# the eq tunnel auctions site, scraped page by page
+class SitePriceSource(PriceSource):
+    def fetch(self, item_name, slug=None):
+        return scrape_auctions(item_name, slug)
+
+
+# a local price dump (a json lines or csv file, or a folder
+# of them and saved item pages), read into memory the
+# first time it is asked for an item
+class FilePriceSource(PriceSource):
+    def __init__(self, name, argument=''):
+        if not os.path.exists(argument):
+            raise FileNotFoundError(f'no price dump at {argument!r}')
+
+        super().__init__(name, argument)
+        self.auction_lists = None
+        self.lock = threading.Lock()
+
+    def fetch(self, item_name, slug=None):
+        with self.lock:
+            if self.auction_lists is None:
+                self.auction_lists = dict(self.read_dump())
+
+        return self.auction_lists.get(item_name, [])
+
+    def read_dump(self):
+        if os.path.isdir(self.argument):
+            for file_name in sorted(os.listdir(self.argument)):
+                yield from read_dump_file(os.path.join(self.argument, file_name))
+        else:
+            yield from read_dump_file(self.argument)
+
+
+# add a kind of price source, so that a sources= entry of
+# kind (or kind:argument) creates it with source_class(kind,
+# argument); a script can register its own before running
+# the app, or name a class by its module path in sources=
+def register_price_source(kind, source_class):
+    PRICE_SOURCE_KINDS[kind] = source_class
+
+
+# build the price sources listed in sources= (comma separated
+# kind or kind:argument entries, in priority order); a kind
+# that isn't registered is taken as module.Class; returns
+# the sources and a message for each entry left out because
+# it couldn't be created
+def build_price_sources(spec):
+    sources = []
+    errors = []
+
+    for entry in spec.split(','):
+        kind, _, argument = entry.strip().partition(':')
+
+        if not kind:
+            continue
+
+        try:
+            if kind in PRICE_SOURCE_KINDS:
+                source_class = PRICE_SOURCE_KINDS[kind]
+            elif '.' in kind:
+                module_name, _, class_name = kind.rpartition('.')
+                source_class = getattr(importlib.import_module(module_name), class_name)
+            else:
+                raise ValueError('not a known source or a module.Class')
+
+            sources.append(source_class(kind, argument))
+        except Exception as error:
+            errors.append(f'{entry.strip()}: {error}')
+
+    # always have somewhere to get prices from
+    if len(sources) < 1:
+        sources.append(SitePriceSource('site'))
+
+    return sources, errors
+
+
+# get the price sources in settings, building them on
+# first use
+def get_price_sources():
+    global price_sources, price_source_errors
+
+    with price_sources_lock:
+        if price_sources is None:
+            price_sources, price_source_errors = build_price_sources(price_source_spec)
+
+    return price_sources
+
+
+# build the price sources once settings are loaded, and
+# report any sources= entries that are left out or a merge=
+# policy that isn't known
+def check_price_sources():
+    get_price_sources()
+    problems = list(price_source_errors)
+
+    if merge_policy not in MERGE_POLICIES:
+        problems.append(f'merge={merge_policy}: not one of {", ".join(MERGE_POLICIES)}; using priority')
+
+    if len(problems) > 0:
+        show_app_info('Some price source settings could not be used:\n' + '\n'.join(problems),
+                      'Invalid Price Sources', 'warning')
+
+
+# ask every price source for an item's auctions at the same
+# time and merge the answers by the merge= policy: first
+# (the first source to answer with auctions), priority (the
+# first source, in sources= order, with auctions) or
+# combined (every source's auctions, interleaved newest
+# first); raises the last error if every source failed
+def fetch_from_sources(item_name, slug=None):
+    sources = get_price_sources()
+
+    # a single source needs no fan out
+    if len(sources) == 1:
+        return fetch_from_source(sources[0], item_name, slug)
+
+    executor = get_source_executor(len(sources))
+    futures = [executor.submit(fetch_from_source, source, item_name, slug) for source in sources]
+    policy = merge_policy if merge_policy in MERGE_POLICIES else 'priority'
+
+    try:
+        if policy == 'first':
+            pending = set(futures)
+
+            while len(pending) > 0:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+
+                for future in done:
+                    if future.exception() is None and len(future.result()) > 0:
+                        return future.result()
+
+        elif policy == 'priority':
+            for future in futures:
+                if future.exception() is None and len(future.result()) > 0:
+                    return future.result()
+
+        else:
+            concurrent.futures.wait(futures)
+            auction_lists = [future.result() for future in futures if future.exception() is None]
+
+            if any(len(auctions) > 0 for auctions in auction_lists):
+                return interleave_auctions(auction_lists)
+    finally:
+        # don't start asking sources that are no longer needed
+        for future in futures:
+            future.cancel()
+
+    # no source had auctions; if any failed, its answer might
+    # have been different, so raise rather than let the item
+    # be cached as unknown
+    errors = [future.exception() for future in futures
+              if not future.cancelled() and future.exception() is not None]
+
+    if len(errors) > 0:
+        raise errors[-1]
+
+    return []
+
+
+# ask one price source for an item's auctions; a list with
+# entries that aren't whole numbers counts as the source
+# failing, so it is never merged or cached
+def fetch_from_source(source, item_name, slug):
+    with trace_span('fetch_source', 'fetch', source=source.name, item=item_name):
+        auctions = source.fetch(item_name, slug)
+
+    # the site's windows are checked as its pages are merged
+    if isinstance(auctions, AuctionWindow):
+        return auctions
+
+    auctions = list(auctions) if auctions is not None else []
+    auction_list = whole_numbers(auctions)
+
+    if len(auction_list) != len(auctions):
+        raise ValueError(f'price source {source.name} gave {item_name} prices that are not whole numbers')
+
+    return auction_list
+
+
+# merge several newest-first auction lists into one, taking
+# the newest remaining auction of each list in turn
+def interleave_auctions(auction_lists):
+    auction_lists = [auctions.auction_list if isinstance(auctions, AuctionWindow) else auctions
+                     for auctions in auction_lists]
+
+    return [price for prices in itertools.zip_longest(*auction_lists) for price in prices if price is not None]
+
+
+# get the pool that asks the price sources, creating it on
+# first use; it holds a thread per source for each worker
+def get_source_executor(source_count):
+    global source_executor
+
+    with price_sources_lock:
+        if source_executor is None:
+            source_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=setting_as_int(scrape_workers, 4) * source_count)
+
+    return source_executor
+
+
+# ----------------------------------------
+# ---------- rate limit functions --------
+# ----------------------------------------
+
+# raised when the auction site turns a request away
+class SiteBusyError(Exception):
+    def __init__(self, status, retry_after=None):
+        super().__init__(f'eqtunnelauctions.com answered {status}')
+        self.status = status
+        self.retry_after = retry_after
+
+
+# paces requests to the auction site, adapting the rate to
+# how the site copes: each quick response adds a little to
+# the rate, while slow responses and 429/5xx answers cut
+# it by a factor (additive increase, multiplicative decrease)
+class RateLimiter:
+    def __init__(self, rate, max_rate, retries):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.retries = retries
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    # run func(*args) in the next free slot, retrying with
+    # jittered exponential backoff if the site is busy or
+    # the connection fails
+    def run(self, func, *args):
+        for attempt in range(self.retries + 1):
+            self.wait_turn()
+            start = time.monotonic()
+
+            try:
+                result = func(*args)
+            except (SiteBusyError, requests.exceptions.ConnectionError, requests.exceptions.Timeout) as error:
+                self.slow_down(RATE_DECREASE)
+
+                if attempt == self.retries:
+                    raise
+
+                self.back_off(attempt, getattr(error, 'retry_after', None))
+                continue
+
+            self.adjust(time.monotonic() - start)
 
-        # update total items field with the number of items to import
-        tot_items.set(str(len(item_list)))
+            return result
 
-        # start a thread so that sheet can be updated while importing items
-        # this acts as a sort of progress bar
-        thread = threading.Thread(target=lambda: build_price_list(item_list))
-        thread.start()
+    # wait until the next request slot at the current rate
+    def wait_turn(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + 1.0 / self.rate
 
-        set_sheet_columns()
+        time.sleep(slot - now)
+
+    # raise the rate after a quick response, or lower it a
+    # little after a slow one
+    def adjust(self, latency):
+        if latency > TARGET_LATENCY:
+            self.slow_down(LATENCY_DECREASE)
+        else:
+            with self.lock:
+                self.rate = min(self.max_rate, self.rate + RATE_INCREASE)
+
+    # cut the rate by factor, and push back the next slot
+    def slow_down(self, factor):
+        with self.lock:
+            self.rate = max(MIN_RATE, self.rate * factor)
+            self.next_slot = max(self.next_slot, time.monotonic() + 1.0 / self.rate)
+
+    # sleep before a retry; the delay doubles with each attempt,
+    # is jittered so that workers don't retry in lockstep, and
+    # is never shorter than the site's Retry-After
+    def back_off(self, attempt, retry_after=None):
+        delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)
+        delay = random.uniform(delay / 2, delay)
+
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        count_trace('retries')
+        time.sleep(delay)
+
+
+# get the shared rate limiter, creating it from settings
+# on first use; its learned rate carries over between
+# imports for the rest of the session
+def get_rate_limiter():
+    global rate_limiter
+
+    # every download goes through here first
+    load_network()
+
+    with rate_limiter_lock:
+        if rate_limiter is None:
+            max_rate = setting_as_float(rate_ceiling, 30.0, MIN_RATE)
+            rate_limiter = RateLimiter(min(max_rate, setting_as_float(start_rate, 8.0, MIN_RATE)), max_rate,
+                                       setting_as_int(max_retries, 3, 0))
+
+    return rate_limiter
+
+
+# ----------------------------------------
+# ------------ cache functions -----------
+# ----------------------------------------
+
+# open the on-disk price cache, creating it if needed; the
+# connection is shared by the scraper threads, so every
+# use of it must hold cache_lock
+def open_cache():
+    global cache_db
+
+    if cache_db is None:
+        cache_db = sqlite3.connect(CACHE_FILE, check_same_thread=False, isolation_level=None)
+        # write-ahead logging lets each write skip most of the
+        # syncing a rollback journal needs; a crash can only
+        # lose the last few scrapes, which are fetched again
+        cache_db.execute('PRAGMA journal_mode=WAL')
+        cache_db.execute('PRAGMA synchronous=NORMAL')
+        cache_db.execute('CREATE TABLE IF NOT EXISTS auctions ('
+                         'item TEXT PRIMARY KEY, auctions TEXT NOT NULL, '
+                         'fetched REAL NOT NULL, used REAL NOT NULL)')
+        cache_db.execute('CREATE INDEX IF NOT EXISTS auctions_used ON auctions (used)')
+        # auction histories loaded from a bulk price dump
+        cache_db.execute('CREATE TABLE IF NOT EXISTS offline ('
+                         'item TEXT PRIMARY KEY, auctions TEXT NOT NULL, loaded REAL NOT NULL)')
+        # every auction seen for each item, numbered oldest to
+        # newest
+        cache_db.execute('CREATE TABLE IF NOT EXISTS history ('
+                         'item TEXT NOT NULL, seq INTEGER NOT NULL, price TEXT NOT NULL, '
+                         'PRIMARY KEY (item, seq)) WITHOUT ROWID')
+        # the list heads older versions kept; the history
+        # itself is now matched instead
+        cache_db.execute('DROP TABLE IF EXISTS history_items')
+        # every item ever imported, by zeal item id
+        cache_db.execute('CREATE TABLE IF NOT EXISTS catalog ('
+                         'id TEXT PRIMARY KEY, name TEXT NOT NULL, slug TEXT NOT NULL, '
+                         'price TEXT NOT NULL) WITHOUT ROWID')
+
+    return cache_db
+
+
+# look up an item's cached auction list; returns None if the
+# item is not cached or its entry is older than its ttl
+def cache_get(item_name):
+    return cache_get_many([item_name]).get(item_name)
+
+
+# look up the cached auction lists of many items at once;
+# returns a dict of item name to auction list, leaving out
+# items that are not cached or are older than their ttl
+def cache_get_many(item_names):
+    now = time.time()
+    # items with no auction data get a shorter ttl, since
+    # they are the most likely to show up on the site soon
+    max_age = setting_as_float(cache_ttl, 12.0) * 3600
+    unknown_max_age = setting_as_float(unknown_ttl, 2.0) * 3600
+    auction_lists = {}
+    item_names = list(dict.fromkeys(item_names))
+
+    with cache_lock:
+        db = open_cache()
+
+        # query in chunks to stay under sqlite's parameter limit
+        for start in range(0, len(item_names), CACHE_QUERY_SIZE):
+            chunk = item_names[start:start + CACHE_QUERY_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            rows = db.execute(f'SELECT item, auctions, fetched FROM auctions WHERE item IN ({placeholders})',
+                              chunk).fetchall()
+
+            for item_name, auctions, fetched in rows:
+                auction_list = json.loads(auctions)
+
+                if now - fetched <= (max_age if len(auction_list) > 0 else unknown_max_age):
+                    auction_lists[item_name] = auction_list
+
+        db.executemany('UPDATE auctions SET used = ? WHERE item = ?',
+                       [(now, item_name) for item_name in auction_lists])
+
+    return auction_lists
+
+
+# store an item's freshly scraped auction list in the cache
+def cache_put(item_name, auction_list):
+    now = time.time()
+
+    with cache_lock:
+        open_cache().execute('INSERT OR REPLACE INTO auctions VALUES (?, ?, ?, ?)',
+                             (item_name, json.dumps(auction_list), now, now))
+
+
+# evict the least recently used entries once the cache
+# holds more items than the user's limit
+def trim_cache():
+    with cache_lock:
+        open_cache().execute('DELETE FROM auctions WHERE item IN '
+                             '(SELECT item FROM auctions ORDER BY used DESC LIMIT -1 OFFSET ?)',
+                             (setting_as_int(cache_size, 5000),))
+
+
+# remove every entry from the price cache, along with the
+# auction history, so the next import starts from scratch
+def clear_cache():
+    with cache_lock:
+        db = open_cache()
+        db.execute('DELETE FROM auctions')
+        db.execute('DELETE FROM history')
+        auction_windows.clear()
+
+    show_app_info('Price cache cleared.', 'Cache Cleared', 'info')
+
+
+# ----------------------------------------
+# ---------- catalog functions -----------
+# ----------------------------------------
+
+# load the item catalog (every item ever imported, by zeal
+# item id) into memory with a single query, the first time
+# it is needed; must be called holding cache_lock
+def load_catalog():
+    global item_catalog
+
+    if item_catalog is None:
+        rows = open_cache().execute('SELECT id, name, slug, price FROM catalog').fetchall()
+        item_catalog = {int(item_id): CatalogEntry(name, slug, price) for item_id, name, slug, price in rows}
+
+    return item_catalog
+
+
+# return the catalog entry of every [name, id] item in the
+# list, adding the items seen for the first time (or under
+# a new name) to the catalog in one write
+def catalog_entries(def_item_list):
+    entries = []
+    new_entries = {}
+
+    with cache_lock:
+        catalog = load_catalog()
+
+        for item_plus_id in def_item_list:
+            entry = catalog.get(item_plus_id[1])
+
+            if entry is None or entry.name != item_plus_id[0]:
+                entry = CatalogEntry(item_plus_id[0], encode_item_name(item_plus_id[0]),
+                                     entry.price if entry is not None else '')
+                catalog[item_plus_id[1]] = entry
+                new_entries[item_plus_id[1]] = entry
+
+            entries.append(entry)
+
+        if len(new_entries) > 0:
+            open_cache().executemany('INSERT OR REPLACE INTO catalog VALUES (?, ?, ?, ?)',
+                                     [(item_id, *entry) for item_id, entry in new_entries.items()])
+
+    return entries
+
+
+# remember the latest price of each [name, id, price] row
+# in the catalog, in one write
+def catalog_record_prices(def_price_list):
+    changed = []
+
+    with cache_lock:
+        catalog = load_catalog()
+
+        for item in def_price_list:
+            # skip items a cancelled import didn't price
+            if item is None:
+                continue
+
+            entry = catalog.get(item[1])
+
+            if entry is not None and item[2] != 'unknown' and entry.price != str(item[2]):
+                catalog[item[1]] = entry._replace(price=str(item[2]))
+                changed.append((str(item[2]), item[1]))
+
+        if len(changed) > 0:
+            open_cache().executemany('UPDATE catalog SET price = ? WHERE id = ?', changed)
+
+
+# ----------------------------------------
+# ---------- history functions -----------
+# ----------------------------------------
+
+# the most recent auctions_count prices of an item, newest
+# first, with a running total so the mean is kept up to
+# date as each new auction arrives instead of recomputed;
+# auction_list is the whole list it was last fed from,
+# which is what the price cache keeps
+class AuctionWindow:
+    def __init__(self, size, auction_list=()):
+        self.prices = collections.deque(maxlen=size)
+        self.total = 0
+        self.auction_list = list(auction_list)
+
+        # auction lists are newest first, so add oldest first
+        for price in reversed(auction_list):
+            self.push(price)
+
+    # add a new auction, dropping the oldest one once the
+    # window is full
+    def push(self, price):
+        price = int(price)
+
+        if len(self.prices) == self.prices.maxlen:
+            self.total -= self.prices[-1]
+
+        self.prices.appendleft(price)
+        self.total += price
+
+    # price the window with the user's price method
+    def price(self):
+        if len(self.prices) < 1:
+            return 'unknown'
+
+        if price_method in PRICE_METHODS and price_method != 'mean':
+            return price_auctions(self.prices, price_method)
+
+        # drop any fraction, then round up to the nearest multiple of 50
+        return round_to_50(self.total // len(self.prices))
+
+    def __len__(self):
+        return len(self.prices)
+
+
+# merge a freshly scraped auction list (raw text, or None)
+# into an item's history, adding only the auctions that are
+# new since the last scrape, and return its updated window;
+# a page with no auctions leaves the history alone
+def merge_auction_history(item_name, data):
+    size = setting_as_int(auctions_count, 15)
+    auction_list = split_auctions(data)
+
+    if len(auction_list) < 1:
+        return AuctionWindow(size)
+
+    # check before anything is stored, so a bad page can't
+    # leave entries in the history that can't be priced
+    if len(whole_numbers(auction_list)) != len(auction_list):
+        raise ValueError(f'the auction data for {item_name} has prices that are not whole numbers')
+
+    with cache_lock:
+        db = open_cache()
+        # the stored history, newest first, as far back as the
+        # new list reaches
+        rows = db.execute('SELECT seq, price FROM history WHERE item = ? ORDER BY seq DESC LIMIT ?',
+                          (item_name, len(auction_list))).fetchall()
+        last_seq = rows[0][0] if len(rows) > 0 else 0
+        new_auctions, overlap = split_new_auctions(auction_list, [price for _, price in rows])
+        window = auction_windows.get(item_name)
+
+        db.execute('BEGIN')
+
+        try:
+            # without an overlap there is no telling which auctions
+            # were already seen, so the history starts over
+            if not overlap:
+                db.execute('DELETE FROM history WHERE item = ?', (item_name,))
+                last_seq = 0
+                window = None
+
+            # number the new auctions oldest to newest, after the
+            # ones already stored
+            db.executemany('INSERT INTO history VALUES (?, ?, ?)',
+                           [(item_name, last_seq + number, price)
+                            for number, price in enumerate(reversed(new_auctions), 1)])
+            last_seq += len(new_auctions)
+            db.execute('DELETE FROM history WHERE item = ? AND seq <= ?', (item_name, last_seq - HISTORY_SIZE))
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+
+        db.execute('COMMIT')
+
+        # slide the new auctions into the item's window, or
+        # load the window from the history if there isn't one
+        # of the right size yet
+        if window is None or window.prices.maxlen != size:
+            rows = db.execute('SELECT price FROM history WHERE item = ? ORDER BY seq DESC LIMIT ?',
+                              (item_name, size)).fetchall()
+            window = AuctionWindow(size, [price for price, in rows])
+        else:
+            for price in reversed(new_auctions):
+                window.push(price)
+
+        window.auction_list = auction_list
+        auction_windows[item_name] = window
+
+    return window
+
+
+# split a raw auction list (or None) into its entries,
+# newest first
+@traced('parse')
+def split_auctions(data):
+    if data is None:
+        return []
+
+    # get rid of quotation marks and split the entries
+    # into individual numbers
+    auction_list = [num.strip() for num in data.replace("\"", "").split(",")]
+
+    return [num for num in auction_list if num]
+
+
+# split the auctions that are new since the last scrape
+# off the front of an auction list, given the stored
+# history, newest first; the rest of the list has to match
+# the history entry for entry, since single prices repeat
+# too often to mark where the last list started; returns
+# the new auctions, newest first, and whether a match was
+# found
+def split_new_auctions(auction_list, history):
+    if len(history) > 0:
+        # the fewest new auctions that leave a matching rest
+        for new_count in range(len(auction_list)):
+            rest = auction_list[new_count:]
+
+            if rest[:len(history)] == history[:len(rest)]:
+                return auction_list[:new_count], True
+
+    return auction_list, False
+
+
+# ----------------------------------------
+# ----------- price dump functions -------
+# ----------------------------------------
+
+# load a bulk dump of auction histories into the offline
+# store, so items it covers are priced without scraping;
+# path is a json lines or csv file, or a folder of them
+# and/or saved item pages; returns the number of items
+# loaded
+def load_price_dump(path):
+    if os.path.isdir(path):
+        file_paths = [os.path.join(path, file_name) for file_name in sorted(os.listdir(path))]
     else:
-        show_app_info('Zeal outputfile specified does not exist.\n'
-                      'Please check in settings and try again.',
-                      'Missing File', 'error')
+        file_paths = [path]
 
+    loaded = 0
 
-# read in user's zeal outputfile and built list of items
-def build_item_list():
-    with open(inventory_path) as file:
-        line = file.readline()
-        raw_item_list = []
-        def_item_list = []
+    with cache_lock:
+        db = open_cache()
+        # one transaction for the whole dump, rather than
+        # one per item
+        db.execute('BEGIN')
 
-        while line:
-            split = line.split('\t')
-            line = file.readline()
+        try:
+            for file_path in file_paths:
+                rows = read_dump_file(file_path)
+
+                while True:
+                    chunk = [(item_name, json.dumps(auction_list), time.time())
+                             for item_name, auction_list in itertools.islice(rows, CACHE_QUERY_SIZE)]
+
+                    if len(chunk) < 1:
+                        break
+
+                    db.executemany('INSERT OR REPLACE INTO offline VALUES (?, ?, ?)', chunk)
+                    loaded += len(chunk)
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+
+        db.execute('COMMIT')
+
+    return loaded
+
+
+# yield (item name, auction list) for every item in one
+# dump file, picking the reader by file extension; entries
+# that aren't whole numbers are dropped, and items with no
+# auctions left are left out, so they are still scraped
+def read_dump_file(file_path):
+    extension = os.path.splitext(file_path)[1].lower()
+
+    if extension in ('.htm', '.html'):
+        rows = read_dump_page(file_path)
+    elif extension == '.csv':
+        rows = read_dump_csv(file_path)
+    elif extension in ('.json', '.jsonl'):
+        rows = read_dump_json(file_path)
+    else:
+        return
+
+    for item_name, auction_list in rows:
+        auction_list = whole_numbers(auction_list)
 
-            # make sure current item should not be excluded
-            if check_exclusion(split[1]):
+        if item_name and len(auction_list) > 0:
+            yield item_name, auction_list
+
+
+# the entries of a dumped auction list that are whole
+# numbers, as text like the site's
+def whole_numbers(auction_list):
+    numbers = []
+
+    for price in auction_list:
+        try:
+            numbers.append(str(int(str(price).strip())))
+        except ValueError:
+            continue
+
+    return numbers
+
+
+# read a csv dump; each line is an item name followed by
+# its prices, newest first
+def read_dump_csv(file_path):
+    with open(file_path, newline='', encoding='utf-8') as file:
+        for row in csv.reader(file):
+            if len(row) < 1 or row[0].strip()[:1] in ('', '#'):
+                continue
+
+            yield row[0].strip(), [price.strip() for price in row[1:] if price.strip()]
+
+
+# read a json lines dump; each line is an object with the
+# item name (item or name) and its prices, newest first
+def read_dump_json(file_path):
+    with open(file_path, encoding='utf-8') as file:
+        for line in file:
+            if not line.strip():
                 continue
 
-            # filter out undesired lines from outputfile
-            if split[0] != 'Location' and split[0][:4] != 'Bank' and split[1] != 'Currency' and split[1] != 'Empty':
-                if int(split[4]) < 1 and split[1][:4] != 'Nili' and split[1][:4] != 'Word' and split[1][:4] != 'Sali':
-                    if split[1][:4] != 'Part' and split[1] != 'Empty':
-                        # if all these filters pass, then grab item name and id and add to list
-                        item_and_id = [split[1], split[2]]
-                        raw_item_list.append(item_and_id)
+            row = json.loads(line)
+            item_name = row.get('item', row.get('name', ''))
 
-    # check all items in raw list for duplicates;
-    # if no duplicates found, add item to final list
-    for raw_item in raw_item_list:
-        duplicate = False
+            yield item_name.strip(), [str(price) for price in row.get('prices', [])]
 
-        for def_item in def_item_list:
-            if raw_item == def_item:
-                duplicate = True
 
-        if duplicate is False:
-            def_item_list.append(raw_item)
+# read a saved item page; the item name is taken from the
+# file name, which may be the item's url-encoded itemstr
+def read_dump_page(file_path):
+    item_name = urllib.parse.unquote_plus(os.path.splitext(os.path.basename(file_path))[0])
 
-    return def_item_list
+    with open(file_path, encoding='utf-8', errors='replace') as file:
+        yield item_name, split_auctions(find_auction_data(file.read()))
 
 
-# get prices for each item from eq tunnel auctions web site
-def build_price_list(def_item_list):
-    # turn off ui buttons so user cannot click until finished
-    disable_ui()
+# look up the auction lists of many items in the offline
+# store; returns a dict of item name to auction list,
+# leaving out items the store does not cover and items
+# loaded longer ago than cache_ttl, whose dump prices are
+# stale enough that a scrape should win
+def offline_get_many(item_names):
+    auction_lists = {}
+    item_names = list(dict.fromkeys(item_names))
+    oldest = time.time() - setting_as_float(cache_ttl, 12.0) * 3600
+
+    with cache_lock:
+        db = open_cache()
+
+        # query in chunks to stay under sqlite's parameter limit
+        for start in range(0, len(item_names), CACHE_QUERY_SIZE):
+            chunk = item_names[start:start + CACHE_QUERY_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            rows = db.execute(f'SELECT item, auctions FROM offline WHERE item IN ({placeholders}) AND loaded >= ?',
+                              chunk + [oldest]).fetchall()
+
+            for item_name, auctions in rows:
+                auction_lists[item_name] = json.loads(auctions)
+
+    return auction_lists
+
+
+# remove every item from the offline store
+def clear_price_dump():
+    with cache_lock:
+        open_cache().execute('DELETE FROM offline')
+
+
+# ask for a dump file and load it on a background thread,
+# since large dumps take a while
+def open_price_dump():
+    file_path = filedialog.askopenfilename(title='Load Price Dump',
+                                           filetypes=[('Price dumps', '*.jsonl *.json *.csv'),
+                                                      ('Saved item pages', '*.htm *.html')])
+
+    if file_path:
+        threading.Thread(target=lambda: report_price_dump(file_path)).start()
+
+
+# load a dump and tell the user how it went
+def report_price_dump(file_path):
+    try:
+        loaded = load_price_dump(file_path)
+    except (OSError, ValueError, AttributeError, sqlite3.Error) as error:
+        show_app_info(f'Price dump could not be loaded: {error}', 'Price Dump Error', 'error')
+        return
+
+    show_app_info(f'{loaded} item(s) loaded from the price dump.', 'Price Dump Loaded', 'info')
+
+
+# ----------------------------------------
+# ----------- prefetch functions ---------
+# ----------------------------------------
+
+# start watching the outputfile in settings on a daemon
+# thread, prefetching prices whenever it changes
+def start_watcher():
+    watch_stop.clear()
+    threading.Thread(target=watch_outputfile, daemon=True).start()
 
-    def_price_list = []
-    auction_list = []
-
-    for index, item_plus_id in enumerate(def_item_list):
-        # begin url string
-        url = 'https://eqtunnelauctions.com/item.php?itemstr='
-        # split item into individual words
-        words = item_plus_id[0].split()
-        # count the words
-        num_words = len(words)
-        item_string = ''
-
-        curr_item.set(str(index + 1))
-
-        # take the individual words of the item name, and
-        # append them together with plus symbols between
-        for i in range(num_words):
-            if i == 0:
-                item_string = f'{words[i]}'
-
-                # if this is a spell, insert character code
-                # for a colon
-                if words[i][5:] == 'Spell':
-                    item_string = item_string + '%3A'
-            else:
-                item_string = item_string + f'+{words[i]}'
 
-        # add the formated item name to the url string
-        url = url + item_string
-        # run web scraper to get list of prices
+# poll the outputfile's modification time every watch
+# seconds, and prefetch once a change has settled; runs
+# until watch_stop is set
+def watch_outputfile():
+    last_mtime = None
+
+    while True:
         try:
-            auction_list = scrape_page(url)
-        except requests.exceptions.ReadTimeout as error:
-            show_app_info(f'ReadTimeout error encountered: {error}\nContinuing to scan...',
-                          'ReadTimeout Error', 'error')
-        except urllib.error.HTTPError as error:
-            show_app_info(f'HTTP error encountered: {error}\nContinuing to scan...',
-                          'HTTP Error', 'error')
-        except urllib.error.URLError as error:
-            show_app_info(f'URL SSL error encountered: {error}\nContinuing to scan...',
-                          'URL Error', 'error')
-
-        # if auctions were found, run price calculator
-        if len(auction_list) > 0:
-            price = calculate_price(auction_list)
-        # otherwise, just flag item as ?
-        else:
-            price = 'unknown'
+            mtime = os.stat(inventory_path).st_mtime_ns
+        except OSError:
+            mtime = last_mtime
 
-        # append everything to the master price list
-        def_price_list.append([item_plus_id[0], item_plus_id[1], price])
+        # wait for zeal to finish writing before reading, and
+        # try again next time if an import held up the prefetch
+        settled = time.time() - mtime / 1000000000 >= WATCH_SETTLE if mtime is not None else False
 
-        # allow UI updates outside of thread
-        app.after(0, update_sheet([item_plus_id[0], item_plus_id[1], price, False]))
+        if mtime != last_mtime and settled and prefetch_outputfile():
+            last_mtime = mtime
 
-    enable_ui()
+        # batch mode can watch with watch=0, using the default
+        interval = setting_as_float(watch_interval, 0.0)
 
-    return def_price_list
+        if watch_stop.wait(interval if interval > 0 else WATCH_INTERVAL):
+            return
 
 
-# take in a url string, scrap html code from page,
-# and assemble list of prices
-def scrape_page(url):
-    # open web page, read in the html, and translate into text
-    page = requests.get(url, verify=False)
+# price every item in the outputfile in settings, scraping
+# the ones that aren't fresh in the cache, so the next
+# import is served from it; with autosave=1, also write the
+# macros to the mule ini; returns False if an import was
+# running or interrupted the prefetch
+def prefetch_outputfile():
+    if not prefetch_lock.acquire(blocking=False):
+        return False
 
-    html = page.text
-    auction_list = []
-    # look for the  start of the list of previous auctions
-    data_start = html.find("data: [")
+    try:
+        enable_trace(False)
+        item_list = build_item_list()
+        # wait for the scrapes in flight when an import cancels
+        # the prefetch, so they don't run (and compete for the
+        # rate limiter) alongside the import
+        price_list = price_items(item_list, cancel=prefetch_cancel, quiet=True, wait=True)
+        trim_cache()
 
-    # if data start point was found...
-    if data_start != -1:
-        # look for the end point
-        data_end = html.find('],', data_start)
-        # slice out the string of prices from the html code
-        data_list = html[data_start + 7:data_end]
-        # get rid of quotation marks
-        num_list = data_list.replace("\"", "")
-        # and split the entries into individual numbers
-        separated_list = num_list.split(",")
-
-        # add the numbers to the auction list
-        for num in separated_list:
-            auction_list.append(num)
+        if any(item is None for item in price_list):
+            return False
 
-    return auction_list
+        saved = auto_save == '1' and len(price_list) > 0 and check_file(character_path)
 
+        if saved:
+            write_macros(price_list, character_path, hotkey_page, hotkey_button)
+    except (OSError, ValueError, sqlite3.Error) as error:
+        report_prefetch(f'Prefetch failed: {error}')
+        return True
+    finally:
+        enable_trace(True)
+        prefetch_lock.release()
 
-# take in a list of numbers and calculate
-# an average price based on user settings
-def calculate_price(def_auction_list):
-    sum_price = 0
-    price_count = 0
-    divisor = int(auctions_count)
-
-    # if there are fewer price points then
-    # the user's desired number of auctions,
-    # set the divisor to the number of prices
-    # found
-    if len(def_auction_list) < divisor:
-        divisor = len(def_auction_list)
-
-    # loop through price list, summing until
-    # number of sums matches divisor
-    for price in def_auction_list:
-        sum_price = sum_price + int(price)
-        price_count += 1
-
-        if price_count == divisor:
-            break
+    unknown = sum(1 for item in price_list if item[2] == 'unknown')
+    report_prefetch(f'Prefetched {len(price_list)} items ({unknown} unknown) at {time.strftime("%H:%M")}'
+                    f'{", macros saved" if saved else ""}')
+
+    return True
 
-    # calculate average price by dividing sum by divisor,
-    # then rounding it up to the nearest multiple of 50
-    avg_price = round_to_50(sum_price // divisor)
 
-    return avg_price
+# show a prefetch result in the summary line, or print it
+# when running headless
+def report_prefetch(message):
+    if app is None:
+        print(message)
+    else:
+        post_ui('summary', message)
 
 
-# take in a number and ceiling it
-# up to the nearest multiple of 50
-def round_to_50(num, base=50):
-    return base * math.ceil(num / base)
+# pause background prefetching while an import prices
+# items: a running prefetch stops at its next item, and
+# none starts until the import is done
+@contextlib.contextmanager
+def pause_prefetch():
+    prefetch_cancel.set()
+
+    with prefetch_lock:
+        prefetch_cancel.clear()
+        yield
+
+
+# watch the outputfile in the foreground for batch mode;
+# returns the exit code once stopped with Ctrl+C
+def run_watch():
+    if not check_file(inventory_path):
+        print('Zeal outputfile specified does not exist.', file=sys.stderr)
+        return 1
+
+    print(f'Watching {inventory_path}; press Ctrl+C to stop.')
+
+    try:
+        watch_outputfile()
+    except KeyboardInterrupt:
+        pass
+
+    return 0
 
 
 # ----------------------------------------
-# ----------- export functions -----------
+# ---------- checkpoint functions --------
 # ----------------------------------------
 
+# start the checkpoint of an import: a json lines file whose
+# first line holds the outputfile, the full item list and
+# the refresh mode, followed by one [name, id, price,
+# priced_at] line per priced item, starting with the rows
+# already restored; returns the open file
+def open_checkpoint(item_list, restored_list, force_refresh):
+    checkpoint = open(CHECKPOINT_FILE, 'w', encoding='utf-8')
+    checkpoint.write(json.dumps({'inventory_path': inventory_path, 'items': item_list,
+                                 'force_refresh': force_refresh}) + '\n')
 
-# use the contents of the sheet to build a list of items
-# to insert into character ini file
-def build_file_list(price_list):
-    if not check_file(character_path):
-        show_app_info('Character ini file specified does not exist.\n'
-                      'Please check in settings and try again.',
-                      'Missing File', 'warning')
-        return
+    for row in restored_list:
+        checkpoint.write(json.dumps(row) + '\n')
 
-    def_price_list = []
+    checkpoint.flush()
 
-    # make sure there's data in the sheet first
-    if len(sheet.get_sheet_data()) < 1:
-        ttk.dialogs.Messagebox.show_error('Please import item data first.', 'No Data')
+    return checkpoint
+
+
+# add a priced item to the checkpoint; each line is flushed
+# so it survives the app being closed or crashing
+def write_checkpoint(checkpoint, item):
+    checkpoint.write(json.dumps([item[0], item[1], item[2], time.time()]) + '\n')
+    checkpoint.flush()
+
+
+# read the checkpoint left by an unfinished import of the
+# current outputfile; returns (item list, priced rows,
+# force refresh), or None if there is nothing to resume
+def read_checkpoint():
+    if not check_file(CHECKPOINT_FILE):
+        return None
+
+    try:
+        with open(CHECKPOINT_FILE, encoding='utf-8') as file:
+            header = json.loads(file.readline())
+            rows = []
+
+            for line in file:
+                # a crash can leave the last line half written
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    break
+    except (OSError, ValueError):
+        return None
+
+    if header.get('inventory_path') != inventory_path:
+        return None
+
+    return header['items'], rows, header.get('force_refresh', False)
+
+
+# remove the checkpoint once its import has finished
+def remove_checkpoint():
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(CHECKPOINT_FILE)
+
+
+# resume an unfinished import: restore the rows it priced
+# and scrape only the items it had left
+def resume_import():
+    checkpoint = read_checkpoint()
+
+    if checkpoint is None:
+        show_app_info('There is no unfinished import of this outputfile to resume.',
+                      'Nothing to Resume', 'info')
         return
 
-    # build new item list with only items not
-    # marked for exclusion, so that len of list
-    # is accurate; items marked for exclusion
-    # get added to exclusions list
-    for item in price_list:
-        if item[3] is False:
-            def_price_list.append(item)
-        else:
-            add_exclusion(item[0])
-
-    # print(def_price_list)
-    # open the ini file
-    with open(character_path) as file:
-        file_contents = []
-        item_index = 0
-        line_num = 1
-        button_num = int(hotkey_button)
-        line_to_write = ''
-        new_button = True
-        social_found = False
-        # each macro can store 30 items, so ceil the quotient of
-        # the item list count and 30,
-        total_buttons = math.ceil(len(def_price_list) / 30)
-
-        # read in entire ini file, excluding entries that match
-        # user's desired hotkey page and button, or contain
-        # the word auction
-        for line in file:
-            skip_line = False
-
-            # flag system that we are in [Socials] section,
-            # because we don't want line ignoring logic
-            # to run anywhere else
-            if '[Socials]' in line:
-                social_found = True
-
-            # loop to eliminate not only the users start button number,
-            # but any additional buttons that will be created, only run
-            # this if socials has been found (i.e., we don't want to ignore
-            # lines other than [Socials] macros that have the same page
-            # and button as user selected
-            if social_found is True:
-                for i in range(button_num, total_buttons + 1):
-                    search_string = f'Page{hotkey_page}Button{i}'
-                    search_loc = len(search_string)
-
-                    # if user's page/button pref is present, we want
-                    # to skip adding this line
-                    if search_string in line:
-                        # however, make sure if button_num is 1, we
-                        # don't accidentally delete existing macros
-                        # stored in button 11 or 12
-                        if not line[search_loc].isnumeric():
-                            skip_line = True
-
-            # if not skipping, then add line to list
-            if skip_line is False:
-                file_contents.append(line)
+    item_list, rows, force_refresh = checkpoint
+    priced_rows = {(row[0], row[1]): row for row in rows}
+    restored_list = [priced_rows[(item[0], item[1])] for item in item_list if (item[0], item[1]) in priced_rows]
+    scrape_list = [item for item in item_list if (item[0], item[1]) not in priced_rows]
 
-    # if socials does not already exist in .ini, create it
-    if social_found is False:
-        write_line(file_contents, '[Socials]')
+    clear_form()
+    reset_trace()
+    aggregate_mules.clear()
+    cancel_event.clear()
+    tot_items.set(str(len(item_list)))
+    insert_sheet_rows([[item[0], item[1], item[2], False] for item in restored_list])
+    disable_ui()
 
-    # now loop through item list to add lines for auction
-    # macros to bottom of file (EQ doesn't care what order
-    # they are in)
-    for index, item in enumerate(def_price_list):
-        # if this is a new button, create the name and color lines,
-        # then flip flag to false
-        if new_button is True:
-            write_line(file_contents, f'Page{hotkey_page}Button{button_num}Name=Auction{button_num}')
-            write_line(file_contents, f'Page{hotkey_page}Button{button_num}Color=0')
-            new_button = False
-
-        # if this is the first auction line of the macro
-        if item_index == 0:
-            line_to_write = f'Page{hotkey_page}Button{button_num}Line{line_num}=/auction WTS '
-
-        # format the item id to be 6 digits long
-        if len(item[1]) == 5:
-            format_id = f'0{item[1]}'
-        else:
-            format_id = f'00{item[1]}'
+    thread = threading.Thread(target=lambda: run_import(item_list, restored_list, scrape_list, force_refresh))
+    thread.start()
+
+    set_sheet_columns()
+
+
+# stop the running import; items already priced stay in
+# the sheet and the checkpoint
+def cancel_import():
+    cancel_event.set()
+    import_button.configure(state=ttk.DISABLED)
 
-        # append the current item name, id, and price to the auction line,
-        # including DC2 tags so that EQ will read it as an item link
-        line_to_write = line_to_write + f'{format_id} {item[0]} {item[2]}'
 
-        # if there are more items to add to this line,
-        # then append a comma to the line
-        if item_index < 5 and index < len(def_price_list) - 1:
-            line_to_write = f'{line_to_write}, '
+# ----------------------------------------
+# ------ incremental import functions ----
+# ----------------------------------------
+
+# read the rows recorded by the last import of the
+# current outputfile; returns an empty list if none
+def load_last_import():
+    if not check_file(LAST_IMPORT_FILE):
+        return []
+
+    try:
+        with open(LAST_IMPORT_FILE) as file:
+            last_imports = json.load(file)
+    except (OSError, ValueError):
+        return []
+
+    # item ids were once recorded as text
+    return [[row[0], int(row[1]), *row[2:]] for row in last_imports.get(inventory_path, [])]
+
+
+# record rows of [name, id, price, priced_at] as the last
+# import of the current outputfile
+def save_last_import(rows):
+    last_imports = {}
+
+    if check_file(LAST_IMPORT_FILE):
+        try:
+            with open(LAST_IMPORT_FILE) as file:
+                last_imports = json.load(file)
+        except (OSError, ValueError):
+            last_imports = {}
+
+    last_imports[inventory_path] = rows
+
+    with open(LAST_IMPORT_FILE, 'w') as file:
+        json.dump(last_imports, file)
+
 
-        # if current auction line contains 6 items,
-        # then add it to file list and reset variables
-        if item_index == 5:
-            write_line(file_contents, line_to_write)
+# split a freshly parsed item list into rows that can be
+# restored from the last import, and items that must be
+# scraped because they are new or their price is stale
+def diff_last_import(item_list):
+    max_age = setting_as_float(cache_ttl, 12.0) * 3600
+    now = time.time()
+    last_rows = {(row[0], row[1]): row for row in load_last_import()}
+    restored_list = []
+    scrape_list = []
 
-            line_to_write = ''
-            item_index = 0
-            line_num += 1
+    for item in item_list:
+        row = last_rows.get((item[0], item[1]))
+
+        if row is not None and row[2] != 'unknown' and now - row[3] <= max_age:
+            restored_list.append(row)
         else:
-            item_index += 1
-
-        # if there are already 5 lines of auctions in the
-        # current macro button, flag to create a new
-        # button on the next loop iteration
-        if line_num == 6:
-            new_button = True
-            button_num += 1
-            line_num = 1
-
-    # a special clause for when there are no more items,
-    # but the current macro line does not contain 6 items,
-    # we still want the current item added
-    if len(line_to_write) > 1:
-        write_line(file_contents, line_to_write)
-
-    # finally, call functions to perform the file write
-    # operation, clear the sheet, and notify user
-    write_new_file(file_contents)
-    clear_form()
-    show_app_info('Auction macro(s) successfully created in .ini file.\n'
-                  'Please log into EverQuest to see the changes.',
-                  'Write Successful', 'info')
+            scrape_list.append(item)
 
+    return restored_list, scrape_list
 
-# add line parameter, with a newline, to the items list
-def write_line(items, line):
-    line_to_write = line + f'\n'
-    items.append(line_to_write)
 
-    return items
+# copy prices from a saved sheet back into the last import,
+# so that price adjustments survive an incremental import
+def record_saved_prices(price_list):
+    last_rows = load_last_import()
 
+    if len(last_rows) < 1:
+        return
 
-# take the file list, with auction macro(s), assembled
-# above and write it to disk, over-writing existing file
-def write_new_file(file_contents):
-    global character_path
+    saved_prices = {(item[0], item[1]): item[2] for item in price_list}
 
-    with open(character_path, 'w') as file:
-        for line in file_contents:
-            file.write(line)
+    for row in last_rows:
+        row[2] = saved_prices.get((row[0], row[1]), row[2])
+
+    save_last_import(last_rows)
 
 
 # ----------------------------------------
 # --------- exclusion functions ----------
 # ----------------------------------------
 
-# compare item parameter to exclusions list
+# compare item parameter to exclusions list,
+# using the in memory index for an exact match
 def check_exclusion(item):
-    with open('settings') as file:
-        line = file.readline()
+    return item in exclusions_index
 
-        while line:
-            if item in line:
-                return True
 
-            line = file.readline()
+# rebuild the exclusions index from the exclusions list;
+# must be called whenever the list is replaced
+def index_exclusions():
+    global exclusions_index
 
-    return False
+    exclusions_index = set(exclusions_list)
 
 
 # add item parameter to in memory exclusions list,
 # then append to settings file
 def add_exclusion(item):
-    exclusions_list.append(item)
+    add_exclusions([item])
+
+
+# add several items to the in memory exclusions list
+# and index, then append them all to the settings
+# file in a single write
+def add_exclusions(items):
+    new_items = []
+
+    for item in items:
+        if item not in exclusions_index:
+            exclusions_list.append(item)
+            exclusions_index.add(item)
+            new_items.append(item)
+
+    if len(new_items) < 1:
+        return
 
     with open('settings', 'a') as file:
-        file.write(f'\n{item}')
+        file.write(''.join(f'\n{item}' for item in new_items))
 
 
 # ----------------------------------------
 # ------------- GUI functions ------------
 # ----------------------------------------
 
-# set next sheet row contents to list_item parameter
-def update_sheet(list_item):
-    index = sheet.get_total_rows()
-    sheet.set_data(index, data=list_item)
+# append several rows to the sheet with a single insert
+# and a single redraw; imported rows are not user edits,
+# so they stay out of the undo stack
+@traced('sheet')
+def insert_sheet_rows(rows):
+    if len(rows) > 0:
+        sheet.insert_rows(rows, undo=False, create_selections=False, redraw=True)
 
 
-# clear all data and reset column widths in sheet
-def clear_form():
-    for i in range(sheet.get_total_rows() - 1, -1, -1):
-        sheet.delete_row(i)
+# queue a UI update from any thread; action is 'row',
+# 'progress', 'message' or the name of a UI function
+# such as 'enable_ui', and pump_ui applies it
+def post_ui(action, value=None):
+    ui_queue.put((action, value))
+
+
+# apply queued UI updates on the Tk main loop, then check
+# again after one frame; all rows queued since the last
+# frame go into the sheet with one insert and redraw
+def pump_ui():
+    rows = []
+    progress = None
+    actions = []
+
+    while True:
+        try:
+            action, value = ui_queue.get_nowait()
+        except queue.Empty:
+            break
 
+        match action:
+            case 'row':
+                rows.append(value)
+            case 'progress':
+                progress = value
+            case 'summary':
+                summary_text.set(value)
+            case _:
+                actions.append((action, value))
+
+    if len(rows) > 0:
+        insert_sheet_rows(rows)
+
+    if progress is not None:
+        curr_item.set(str(progress))
+
+    # run anything else after the rows are in, since
+    # message dialogs block until they are closed
+    for action, value in actions:
+        match action:
+            case 'message':
+                show_app_info(*value)
+            case 'enable_ui':
+                enable_ui()
+            case 'disable_ui':
+                disable_ui()
+
+    app.after(UI_FRAME_MS, pump_ui)
+
+
+# clear all data and reset column widths in sheet; the
+# data is swapped for an empty list in one call, which
+# keeps the checkbox column and empties the undo stack
+@traced('sheet')
+def clear_form():
+    sheet.set_sheet_data([], redraw=False)
     set_sheet_columns()
     curr_item.set('')
     tot_items.set('')
+    summary_text.set('')
 
 
 # set sheet columns to their proper widths
@@ -459,16 +2830,30 @@ def set_sheet_columns():
 # turn off all UI buttons
 def disable_ui():
     file_menu.entryconfig('Settings', state='disabled')
+    file_menu.entryconfig('Force Refresh Import', state='disabled')
+    file_menu.entryconfig('Incremental Import', state='disabled')
+    file_menu.entryconfig('Aggregate Import', state='disabled')
+    file_menu.entryconfig('Clear Price Cache', state='disabled')
+    file_menu.entryconfig('Load Price Dump', state='disabled')
+    file_menu.entryconfig('Resume Import', state='disabled')
     # settings_button.configure(state=ttk.DISABLED)
-    import_button.configure(state=ttk.DISABLED)
+    # while importing, the Import button cancels the import
+    import_button.configure(text='Cancel', command=cancel_import)
     save_button.configure(state=ttk.DISABLED)
 
 
 # turn on all UI buttons
 def enable_ui():
     file_menu.entryconfig('Settings', state='normal')
+    file_menu.entryconfig('Force Refresh Import', state='normal')
+    file_menu.entryconfig('Incremental Import', state='normal')
+    file_menu.entryconfig('Aggregate Import', state='normal')
+    file_menu.entryconfig('Clear Price Cache', state='normal')
+    file_menu.entryconfig('Load Price Dump', state='normal')
+    file_menu.entryconfig('Resume Import', state='normal')
     # settings_button.configure(state=ttk.NORMAL)
-    import_button.configure(state=ttk.NORMAL)
+    import_button.configure(text='Import', command=lambda: import_items(False, incremental_mode.get()),
+                            state=ttk.NORMAL)
     save_button.configure(state=ttk.NORMAL)
 
 
@@ -477,6 +2862,18 @@ def enable_ui():
 # ----------------------------------------
 
 def show_app_info(msg_content, msg_title, msg_type):
+    # with no main window (headless batch mode), print
+    # the message instead of showing a dialog
+    if app is None:
+        print(f'{msg_title}: {msg_content}', file=sys.stderr)
+        return ''
+
+    # dialogs can only be shown from the Tk thread, so
+    # queue messages from any other thread for pump_ui
+    if threading.current_thread() is not threading.main_thread():
+        post_ui('message', (msg_content, msg_title, msg_type))
+        return ''
+
     match msg_type:
         case 'error':
             message = ttk.dialogs.Messagebox.show_error(msg_content, msg_title)
@@ -505,18 +2902,38 @@ def check_file(file):
 
 # read in settings file and assign values to globals
 def read_settings():
-    global inventory_path, character_path, hotkey_page, hotkey_button, auctions_count, exclusions_list
-    read = False
-
     # if the settings file doesn't exist, open
     # settings window and exit
     if not os.path.isfile('settings'):
         open_settings(False)
         return
 
-    # if settings does exist
+    # if all settings have not been found, assume
+    # there is an error in the settings file and
+    # pop settings window so user can fix
+    if not load_settings():
+        show_app_info('Invalid Settings File.\nPlease reconfigure.',
+                      'Invalid Settings', 'warning')
+        open_settings(False)
+        return
+
+    check_price_sources()
+
+
+# read the settings file into globals without touching
+# the UI; returns False if any required setting is missing
+def load_settings():
+    global inventory_path, character_path, hotkey_page, hotkey_button, auctions_count, exclusions_list
+    global scrape_workers, cache_ttl, unknown_ttl, cache_size, stream_fetch, price_method
+    global start_rate, rate_ceiling, max_retries, connect_timeout, read_timeout, import_deadline, hedged_fetch
+    global watch_interval, auto_save, line_length, price_source_spec, merge_policy
+    read = False
+    settings_count = 0
+
+    if not os.path.isfile('settings'):
+        return False
+
     with open('settings') as file:
-        settings_count = 0
         line = file.readline()
 
         while line:
@@ -543,6 +2960,44 @@ def read_settings():
                 case 'auct':
                     auctions_count = setting.strip()
                     settings_count += 1
+                # optional settings below are not counted, so that
+                # older settings files remain valid
+                case 'work':
+                    scrape_workers = setting.strip()
+                case 'stre':
+                    stream_fetch = setting.strip()
+                case 'pric':
+                    price_method = setting.strip()
+                case 'star':
+                    start_rate = setting.strip()
+                case 'rate':
+                    rate_ceiling = setting.strip()
+                case 'retr':
+                    max_retries = setting.strip()
+                case 'conn':
+                    connect_timeout = setting.strip()
+                case 'read':
+                    read_timeout = setting.strip()
+                case 'dead':
+                    import_deadline = setting.strip()
+                case 'hedg':
+                    hedged_fetch = setting.strip()
+                case 'watc':
+                    watch_interval = setting.strip()
+                case 'auto':
+                    auto_save = setting.strip()
+                case 'line':
+                    line_length = setting.strip()
+                case 'sour':
+                    price_source_spec = setting.strip()
+                case 'merg':
+                    merge_policy = setting.strip()
+                case 'cach':
+                    cache_ttl = setting.strip()
+                case 'unkn':
+                    unknown_ttl = setting.strip()
+                case 'max_':
+                    cache_size = setting.strip()
                 case 'outp':
                     inventory_path = setting.strip()
                     settings_count += 1
@@ -555,13 +3010,28 @@ def read_settings():
 
             line = file.readline()
 
-        # if all cases above have not been found, assume
-        # there is an error in the settings file and
-        # pop settings window so user can fix
-        if settings_count != 6:
-            show_app_info('Invalid Settings File.\nPlease reconfigure.',
-                          'Invalid Settings', 'warning')
-            open_settings(False)
+    index_exclusions()
+
+    # all six required settings must have been found
+    return settings_count == 6
+
+
+# convert a string setting to an int, falling back to
+# default if it is missing or not a valid number
+def setting_as_int(value, default, minimum=1):
+    try:
+        return max(minimum, int(value))
+    except (TypeError, ValueError):
+        return default
+
+
+# convert a string setting to a float, falling back to
+# default if it is missing or not a valid number
+def setting_as_float(value, default, minimum=0.0):
+    try:
+        return max(minimum, float(value))
+    except (TypeError, ValueError):
+        return default
 
 
 def open_readme():
@@ -613,7 +3083,8 @@ def open_readme():
 
     settings_text_1 = ttk.Label(readme, font=label_font_small)
     settings_text_1.configure(text=' - Hotkey Starting Location: specify the page and button where auction macros '
-                                   'should begin.  Each macro will store up to 30 items. If necessary, multiple '
+                                   'should begin.  Each macro holds 5 /auction lines, each filled with as many '
+                                   'items as fit in line_length= characters (default 255). If necessary, multiple '
                                    'macros will be created, incrementing the button by 1 each time.', wraplength=500)
     settings_text_1.pack(pady=5, padx=10, fill='x')
 
@@ -732,6 +3203,24 @@ def open_settings(optional):
                 file.write(f'\npage={page.get()}')
                 file.write(f'\nbutton={button.get()}')
                 file.write(f'\nauctions={auctions.get()}')
+                file.write(f'\nprice_method={price_method}')
+                file.write(f'\nworkers={scrape_workers}')
+                file.write(f'\nstream={stream_fetch}')
+                file.write(f'\nstart_rate={start_rate}')
+                file.write(f'\nrate_ceiling={rate_ceiling}')
+                file.write(f'\nretries={max_retries}')
+                file.write(f'\nconnect_timeout={connect_timeout}')
+                file.write(f'\nread_timeout={read_timeout}')
+                file.write(f'\ndeadline={import_deadline}')
+                file.write(f'\nhedge={hedged_fetch}')
+                file.write(f'\nwatch={watch_interval}')
+                file.write(f'\nautosave={auto_save}')
+                file.write(f'\nline_length={line_length}')
+                file.write(f'\nsources={price_source_spec}')
+                file.write(f'\nmerge={merge_policy}')
+                file.write(f'\ncache_ttl={cache_ttl}')
+                file.write(f'\nunknown_ttl={unknown_ttl}')
+                file.write(f'\nmax_cached={cache_size}')
                 file.write(f'\noutputfile={outputfile_path.get()}')
                 file.write(f'\nmule_ini={mule_ini_path.get()}')
                 file.write(f'\n[exclusions]')
@@ -741,6 +3230,8 @@ def open_settings(optional):
                     exclusions_list.append(item)
                     file.write(f'\n{item}')
 
+            index_exclusions()
+
             # after performing write, close settings window
             settings.destroy()
 
@@ -910,10 +3401,6 @@ def open_settings(optional):
 # ------------- code main entry point -------------
 # -------------------------------------------------
 
-# ignore SSL certificate warnings because eqtunnelauctions
-# is getting on my last nerve
-urllib3.disable_warnings()
-
 # set size and location parameters based on OS version
 if platform.release() == '10':
     button_font = ('Inter', 12)
@@ -942,107 +3429,312 @@ else:
     adjust_x_pos = 10
     adjust_y_pos = 63
 
+# ----------- lazily imported modules -----------
+ttk = None
+tksheet = None
+requests = None
+urllib3 = None
+numpy = None
+numpy_checked = False
+
 # ----------- global variables -----------
+app = None
 inventory_path = ''
 character_path = ''
 hotkey_page = ''
 hotkey_button = ''
 auctions_count = ''
+price_method = 'mean'
+scrape_workers = '4'
+stream_fetch = '1'
+start_rate = '8'
+rate_ceiling = '30'
+max_retries = '3'
+connect_timeout = '5'
+read_timeout = '20'
+import_deadline = '0'
+hedged_fetch = '0'
+watch_interval = '0'
+auto_save = '0'
+line_length = '255'
+price_source_spec = 'site'
+merge_policy = 'priority'
+cache_ttl = '12'
+unknown_ttl = '2'
+cache_size = '5000'
 exclusions_list = []
+exclusions_index = set()
+
+# ----------- outputfile parsing -----------
+# one line of a zeal outputfile, after filtering
+InventoryRecord = collections.namedtuple('InventoryRecord', ['location', 'name', 'id', 'count', 'slots'])
+# item name prefixes that are never sold (research
+# pages, words and grimoire parts)
+UNSELLABLE_PREFIXES = frozenset(['Nili', 'Word', 'Sali', 'Part'])
+# outputfiles at least this size are memory-mapped
+MMAP_THRESHOLD = 1024 * 1024
+
+# ----------- price calculation -----------
+PRICE_METHODS = ('mean', 'median', 'trimmed', 'filtered')
+# share of prices dropped from each end by the trimmed method
+TRIM_FRACTION = 0.1
+# how many interquartile ranges past the quartiles a price
+# may fall before the filtered method drops it
+OUTLIER_FENCE = 1.5
+
+# ----------- macro packing -----------
+AUCTION_PREFIX = '/auction WTS '
+# lines in one hotkey button's macro
+LINES_PER_BUTTON = 5
+
+# ----------- item tables -----------
+# stands in for a missing price in an ItemTable
+UNKNOWN_PRICE = -1
+# rows listed when the sheet has ids or prices to correct
+SHEET_PROBLEMS_SHOWN = 10
+
+# ----------- ini writing -----------
+# a [Socials] key such as Page2Button1Line3=; groups are
+# the page and button numbers
+MACRO_KEY = re.compile(r'Page(\d+)Button(\d+)(?:Name|Color|Line\d+)=')
+# the name line of a button holding an auction macro
+AUCTION_NAME_KEY = re.compile(r'Page(\d+)Button(\d+)Name=Auction\d+\s*$')
+
+# ----------- page scraping -----------
+# base address of the auction site; benchmarks point this
+# at a local stand-in
+AUCTION_SITE = 'https://eqtunnelauctions.com'
+STREAM_CHUNK_SIZE = 8192
+
+# ----------- price sources -----------
+price_sources = None
+price_source_errors = []
+source_executor = None
+price_sources_lock = threading.Lock()
+MERGE_POLICIES = ('first', 'priority', 'combined')
+PRICE_SOURCE_KINDS = {'site': SitePriceSource, 'file': FilePriceSource}
+
+# ----------- rate limiting -----------
+rate_limiter = None
+rate_limiter_lock = threading.Lock()
+# requests per second never go below this
+MIN_RATE = 0.5
+# rate added after each quick response
+RATE_INCREASE = 0.5
+# factors the rate is cut by after a 429/5xx or a slow response
+RATE_DECREASE = 0.5
+LATENCY_DECREASE = 0.8
+# seconds after which a response counts as slow
+TARGET_LATENCY = 2.0
+# first retry delay, and the most any retry waits, in seconds
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+# ----------- timeouts and hedging -----------
+# seconds of recent downloads, for the hedging delay
+fetch_latencies = collections.deque(maxlen=200)
+hedge_executor = None
+hedge_lock = threading.Lock()
+# downloads needed before hedging starts
+HEDGE_MIN_SAMPLES = 20
+
+# ----------- price cache -----------
+CACHE_FILE = 'price_cache.db'
+CACHE_QUERY_SIZE = 500
+cache_db = None
+cache_lock = threading.Lock()
+
+# ----------- item catalog -----------
+# an item's name, its encoded name for item urls and its
+# last price ('' until it has been priced)
+CatalogEntry = collections.namedtuple('CatalogEntry', ['name', 'slug', 'price'])
+# catalog entries by item id, guarded by cache_lock
+item_catalog = None
+
+# ----------- auction history -----------
+# auction windows by item name, guarded by cache_lock
+auction_windows = {}
+# auctions kept per item
+HISTORY_SIZE = 1000
+
+# ----------- tracing -----------
+# (name, category, start, end, thread, args) of every span
+trace_spans = []
+trace_counters = {}
+trace_lock = threading.Lock()
+trace_origin = time.perf_counter()
+# cleared while a background prefetch runs
+trace_enabled = True
+
+# ----------- UI update pump -----------
+# updates queued by worker threads for the Tk main loop
+ui_queue = queue.Queue()
+# how often (in milliseconds) pump_ui applies them
+UI_FRAME_MS = 50
+
+# ----------- aggregate import -----------
+# [mule ini, item list] for each mule of the last aggregate
+# import, until its macros are saved
+aggregate_mules = []
+
+# ----------- incremental import -----------
+LAST_IMPORT_FILE = 'last_import'
+
+# ----------- prefetching -----------
+# held while a prefetch or an import prices items
+prefetch_lock = threading.Lock()
+# set to stop a running prefetch
+prefetch_cancel = threading.Event()
+# set to stop the watcher
+watch_stop = threading.Event()
+# seconds an outputfile must go unchanged before it is read
+WATCH_SETTLE = 2.0
+# seconds between polls when watch= is not set
+WATCH_INTERVAL = 30.0
+
+# ----------- checkpoints -----------
+CHECKPOINT_FILE = 'import_checkpoint'
+# set by the Cancel button to stop the running import
+cancel_event = threading.Event()
 
 # ----------------------------------------
 # ------------- main window --------------
 # ----------------------------------------
 
 
-app = ttk.Window(themename='flatly')
-app.geometry('520x620')
-app.title('Auction Builder')
-app.resizable(False, False)
-app.iconbitmap('cashflow.ico')
+# build the main window and its widgets; widgets used by
+# other functions are stored in globals
+def build_main_window():
+    global app, curr_item, tot_items, summary_text, incremental_mode, file_menu, sheet, import_button, save_button
+
+    app = ttk.Window(themename='flatly')
+    app.geometry('520x620')
+    app.title('Auction Builder')
+    app.resizable(False, False)
+    app.iconbitmap('cashflow.ico')
+
+    style = ttk.Style()
+    style.configure('primary.Outline.TButton', font=button_font, width=12)
+    style.configure('primary.TEntry', font=entry_font_small)
+    style.configure('title.TLabel', font=label_font_title)
+    style.configure('primary.TLabel', font=label_font_large)
+    style.configure('secondary.TLabel', font=label_font_small)
+
+    curr_item = ttk.StringVar()
+    tot_items = ttk.StringVar()
+    summary_text = ttk.StringVar()
+    incremental_mode = ttk.BooleanVar()
+
+    # ------------- main settings layout (label/sheet/buttons) -------------
+
+    # ------------- menu setup -------------
+    main_menu = ttk.Menu(app)
+    app.configure(menu=main_menu)
+
+    # ------------- file menu setup -------------
+    file_menu = ttk.Menu(main_menu)
+    file_menu.add_command(label='Settings', command=lambda: open_settings(True))
+    file_menu.add_separator()
+    file_menu.add_checkbutton(label='Incremental Import', variable=incremental_mode)
+    file_menu.add_command(label='Aggregate Import', command=import_aggregate)
+    file_menu.add_command(label='Resume Import', command=resume_import)
+    file_menu.add_command(label='Force Refresh Import', command=lambda: import_items(True))
+    file_menu.add_command(label='Clear Price Cache', command=clear_cache)
+    file_menu.add_command(label='Load Price Dump', command=open_price_dump)
+    file_menu.add_command(label='Export Prices', command=export_prices)
+    file_menu.add_command(label='Export Trace', command=save_trace)
+    file_menu.add_separator()
+    file_menu.add_command(label='Exit', command=sys.exit)
+
+    # ------------- help menu setup -------------
+    help_menu = ttk.Menu(main_menu)
+    help_menu.add_command(label='Readme', command=open_readme)
+    help_menu.add_command(label='About', command=open_about)
+
+    main_menu.add_cascade(label='File', menu=file_menu)
+    main_menu.add_cascade(label='Help', menu=help_menu)
+
+    title = ttk.Label(app, text='Project Quarm Auction Builder', style='title.TLabel')
+    title.pack(pady=10)
+
+    sheet = tksheet.Sheet(app, font=sheet_font)
+    sheet.set_options(default_row_height=30).height_and_width(width=470, height=400)
+    sheet.enable_bindings("single_select", "row_select", "right_click_popup_menu",
+                          "rc_delete_row", "arrowkeys", "rc_select", "rc_insert_row",
+                          "copy", "cut", "paste", "delete", "undo", "edit_cell")
+    sheet.set_header_data(('Item', 'ID', 'Price', 'Exclude')).set_sheet_data([])
+    sheet.checkbox("D")
+    set_sheet_columns()
+    sheet.pack(pady=10)
 
-style = ttk.Style()
-style.configure('primary.Outline.TButton', font=button_font, width=12)
-style.configure('primary.TEntry', font=entry_font_small)
-style.configure('title.TLabel', font=label_font_title)
-style.configure('primary.TLabel', font=label_font_large)
-style.configure('secondary.TLabel', font=label_font_small)
+    # start applying queued updates from the import thread
+    app.after(UI_FRAME_MS, pump_ui)
 
-curr_item = ttk.StringVar()
-tot_items = ttk.StringVar()
+    bottom_frame = ttk.Frame(app)
+    bottom_frame.pack(pady=5)
 
-# ------------- main settings layout (label/sheet/buttons) -------------
+    # ------------- bottom_frame layout -------------
+    status_frame = ttk.Frame(bottom_frame)
+    status_frame.grid(row=0, column=0, padx=10, sticky='nsew')
 
-# ------------- menu setup -------------
-main_menu = ttk.Menu(app)
-app.configure(menu=main_menu)
+    vert_separator = ttk.Separator(bottom_frame, orient='vertical')
+    vert_separator.grid(row=0, column=1, padx=25, sticky='nsew')
 
-# ------------- file menu setup -------------
-file_menu = ttk.Menu(main_menu)
-file_menu.add_command(label='Settings', command=lambda: open_settings(True))
-file_menu.add_separator()
-file_menu.add_command(label='Exit', command=sys.exit)
+    button_frame = ttk.Frame(bottom_frame)
+    button_frame.grid(row=0, column=2, padx=10, sticky='nsew')
 
-# ------------- help menu setup -------------
-help_menu = ttk.Menu(main_menu)
-help_menu.add_command(label='Readme', command=open_readme)
-help_menu.add_command(label='About', command=open_about)
+    # ------------- status_frame layout -------------
+    current_label = ttk.Label(status_frame, style='primary.TLabel', text='Item')
+    current_label.pack(pady=5, padx=5, side='left')
 
-main_menu.add_cascade(label='File', menu=file_menu)
-main_menu.add_cascade(label='Help', menu=help_menu)
+    current_entry = ttk.Entry(status_frame, font=entry_font_large, width=5, justify='center',
+                              foreground='black', textvariable=curr_item, state='disabled')
+    current_entry.pack(pady=5, padx=5, side='left')
 
-title = ttk.Label(app, text='Project Quarm Auction Builder', style='title.TLabel')
-title.pack(pady=10)
+    total_label = ttk.Label(status_frame, style='primary.TLabel', text='Of')
+    total_label.pack(pady=5, padx=5, side='left')
 
-sheet = tksheet.Sheet(app, font=sheet_font)
-sheet.set_options(default_row_height=30).height_and_width(width=470, height=400)
-sheet.enable_bindings("single_select", "row_select", "right_click_popup_menu",
-                      "rc_delete_row", "arrowkeys", "rc_select", "rc_insert_row",
-                      "copy", "cut", "paste", "delete", "undo", "edit_cell")
-sheet.set_header_data(('Item', 'ID', 'Price', 'Exclude')).set_sheet_data([])
-sheet.checkbox("D")
-set_sheet_columns()
-sheet.pack(pady=10)
+    total_entry = ttk.Entry(status_frame, font=entry_font_large, width=5, justify='center',
+                            foreground='black', textvariable=tot_items, state='disabled')
+    total_entry.pack(pady=5, padx=5, side='left')
 
-bottom_frame = ttk.Frame(app)
-bottom_frame.pack(pady=5)
+    # ------------- button_frame layout -------------
+    import_button = ttk.Button(button_frame, text='Import',
+                               command=lambda: import_items(False, incremental_mode.get()))
+    import_button.configure(width=15, style='primary.Outline.TButton')
+    import_button.pack(pady=5)
 
-# ------------- bottom_frame layout -------------
-status_frame = ttk.Frame(bottom_frame)
-status_frame.grid(row=0, column=0, padx=10, sticky='nsew')
+    save_button = ttk.Button(button_frame, text='Save', command=lambda: build_file_list(sheet.get_sheet_data()))
+    save_button.configure(width=15, style='primary.Outline.TButton')
+    save_button.pack(pady=5)
 
-vert_separator = ttk.Separator(bottom_frame, orient='vertical')
-vert_separator.grid(row=0, column=1, padx=25, sticky='nsew')
+    # ------------- import summary -------------
+    summary_label = ttk.Label(app, style='secondary.TLabel', textvariable=summary_text)
+    summary_label.pack(pady=5)
 
-button_frame = ttk.Frame(bottom_frame)
-button_frame.grid(row=0, column=2, padx=10, sticky='nsew')
 
-# ------------- status_frame layout -------------
-current_label = ttk.Label(status_frame, style='primary.TLabel', text='Item')
-current_label.pack(pady=5, padx=5, side='left')
+# start the program; any command line arguments run the
+# headless batch mode instead of the main window
+def main():
+    # needed for the batch process pool in a frozen exe
+    multiprocessing.freeze_support()
 
-current_entry = ttk.Entry(status_frame, font=entry_font_large, width=5, justify='center',
-                          foreground='black', textvariable=curr_item, state='disabled')
-current_entry.pack(pady=5, padx=5, side='left')
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
 
-total_label = ttk.Label(status_frame, style='primary.TLabel', text='Of')
-total_label.pack(pady=5, padx=5, side='left')
+    load_gui()
+    build_main_window()
 
-total_entry = ttk.Entry(status_frame, font=entry_font_large, width=5, justify='center',
-                        foreground='black', textvariable=tot_items, state='disabled')
-total_entry.pack(pady=5, padx=5, side='left')
+    # read in settings file and store in globals
+    read_settings()
 
-# ------------- button_frame layout -------------
-import_button = ttk.Button(button_frame, text='Import', command=import_items)
-import_button.configure(width=15, style='primary.Outline.TButton')
-import_button.pack(pady=5)
+    # start prefetching prices in the background if enabled
+    if setting_as_float(watch_interval, 0.0) > 0:
+        start_watcher()
 
-save_button = ttk.Button(button_frame, text='Save', command=lambda: build_file_list(sheet.get_sheet_data()))
-save_button.configure(width=15, style='primary.Outline.TButton')
-save_button.pack(pady=5)
+    # ------------- tkinter main loop -------------
+    app.mainloop()
 
-# read in settings file and store in globals
-read_settings()
 
-# ------------- tkinter main loop -------------
-app.mainloop()
+if __name__ == '__main__':
+    main()
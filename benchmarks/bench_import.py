@@ -0,0 +1,87 @@
+import argparse
+import os
+import tempfile
+
+import common
+
+
+# ----------------------------------------
+# ------- import/export benchmark --------
+# ----------------------------------------
+
+# time each stage of the import/export pipeline against
+# synthetic inputs and a local stand-in for the auction site
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Auction Builder import and export stages.')
+    parser.add_argument('--lines', type=int, default=2000, help='lines in the synthetic outputfile')
+    parser.add_argument('--items', type=int, default=300, help='distinct items in the outputfile')
+    parser.add_argument('--socials', type=int, default=100, help='existing socials in the synthetic ini')
+    parser.add_argument('--workers', type=int, default=8, help='concurrent fetches (workers= setting)')
+    parser.add_argument('--latency', type=float, default=0.05, help='stand-in latency per page, in seconds')
+    parser.add_argument('--jitter', type=float, default=0.02, help='random +/- latency, in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of pages answered with 429/503')
+    parser.add_argument('--unknown-rate', type=float, default=0.1, help='share of items with no auction data')
+    parser.add_argument('--padding-kb', type=int, default=40, help='html around the chart data, in kilobytes')
+    parser.add_argument('--no-memory', action='store_true', help='skip the traced peak memory runs')
+    options = parser.parse_args()
+    memory = not options.no_memory
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        outputfile = os.path.join(work_dir, 'Bench-Inventory.txt')
+        source_ini = os.path.join(work_dir, 'source.ini')
+        mule_ini = os.path.join(work_dir, 'Bench_pq.proj.ini')
+        common.make_outputfile(outputfile, options.lines, options.items)
+        common.make_ini(source_ini, options.socials)
+
+        app = common.load_app(work_dir)
+        app.scrape_workers = str(options.workers)
+        app.exclusions_list = ['Bone Chips']
+        app.index_exclusions()
+
+        server = common.start_stand_in(options.latency, options.jitter, options.error_rate,
+                                       options.unknown_rate, options.padding_kb)
+        app.AUCTION_SITE = server.url
+
+        print(f'outputfile: {options.lines} lines, {options.items} distinct items; '
+              f'stand-in latency {options.latency}s +/- {options.jitter}s, '
+              f'error rate {options.error_rate}, {options.workers} workers')
+        common.print_header()
+
+        # parse the outputfile
+        seconds, peak, item_list = common.measure(lambda: app.build_item_list(outputfile), memory)
+        common.print_row('build_item_list', seconds, options.lines, peak)
+
+        # scrape every item from the stand-in, ignoring the cache
+        seconds, peak, price_list = common.measure(lambda: app.build_price_list(item_list, True), memory)
+        common.print_row('build_price_list (cold)', seconds, len(item_list), peak)
+
+        # price every item again, served from the cache
+        seconds, peak, price_list = common.measure(lambda: app.build_price_list(item_list), memory)
+        common.print_row('build_price_list (cached)', seconds, len(item_list), peak)
+
+        # the import queues rows for the UI, which nobody drains here
+        while not app.ui_queue.empty():
+            app.ui_queue.get_nowait()
+
+        # price the cached auction lists one at a time, then in one batch
+        auction_lists = list(app.cache_get_many([item[0] for item in item_list]).values())
+        auction_lists = [auction_list for auction_list in auction_lists if len(auction_list) > 0]
+        seconds, peak, _ = common.measure(
+            lambda: [app.calculate_price(auction_list) for auction_list in auction_lists], memory)
+        common.print_row('calculate_price (per item)', seconds, len(auction_lists), peak)
+
+        seconds, peak, _ = common.measure(lambda: app.calculate_prices(auction_lists), memory)
+        common.print_row('calculate_prices (batch)', seconds, len(auction_lists), peak)
+
+        # write the macros (the part of build_file_list after the sheet)
+        seconds, peak, _ = common.measure(
+            lambda: app.write_macros(price_list, common.fresh_copy(source_ini, mule_ini),
+                                     app.hotkey_page, app.hotkey_button), memory)
+        common.print_row('build_file_list (write_macros)', seconds, len(price_list), peak)
+
+        server.shutdown()
+        print(f'stand-in served {server.requests} requests, {server.bytes_sent / 1024:,.0f} KB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import common
+
+
+# ----------------------------------------
+# ---------- price source benchmark ------
+# ----------------------------------------
+
+# a user-defined source, as a sources= module.Class entry
+# would name one; answers every item from memory after a
+# fixed delay
+class SlowMemorySource:
+    delay = 0.0
+
+    def __init__(self, name, argument=''):
+        self.name = name
+        self.prices = [str(100 + index) for index in range(20)]
+
+    def fetch(self, item_name, slug=None):
+        time.sleep(self.delay)
+
+        return self.prices
+
+
+# write a json lines dump covering share of the items
+def make_dump(path, item_names, share):
+    with open(path, 'w', encoding='utf-8') as file:
+        for index, item_name in enumerate(item_names):
+            if index < len(item_names) * share:
+                file.write(json.dumps({'item': item_name, 'prices': [str(500 + index)] * 10}) + '\n')
+
+
+# price every item from scratch with the given sources and
+# merge policy; returns the share of items with a price
+def price_all(app, item_list, spec, policy):
+    app.price_source_spec = spec
+    app.merge_policy = policy
+    app.price_sources = None
+    app.clear_cache()
+
+    for window in list(app.auction_windows):
+        app.auction_windows.pop(window)
+
+    price_list = app.price_items(item_list, True, quiet=True)
+
+    return sum(1 for row in price_list if row[2] != 'unknown') / len(price_list)
+
+
+# time each price source on its own, then every merge policy
+# over all of them, against a local stand-in for the site
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Auction Builder price sources.')
+    parser.add_argument('--items', type=int, default=200, help='distinct items to price')
+    parser.add_argument('--workers', type=int, default=8, help='concurrent fetches (workers= setting)')
+    parser.add_argument('--latency', type=float, default=0.05, help='stand-in latency per page, in seconds')
+    parser.add_argument('--jitter', type=float, default=0.02, help='random +/- latency, in seconds')
+    parser.add_argument('--unknown-rate', type=float, default=0.1, help='share of items with no auction data')
+    parser.add_argument('--dump-share', type=float, default=0.5, help='share of items in the local dump')
+    parser.add_argument('--custom-delay', type=float, default=0.02, help='user-defined source delay, in seconds')
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        app = common.load_app(work_dir)
+        app.scrape_workers = str(options.workers)
+        app.load_network()
+        # clear_cache reports to the window, which isn't there
+        app.show_app_info = lambda *args: None
+
+        server = common.start_stand_in(options.latency, options.jitter, 0.0, options.unknown_rate, 40)
+        app.AUCTION_SITE = server.url
+
+        item_list = [[name, int(item_id)] for name, item_id in common.make_item_names(options.items)]
+        dump_path = os.path.join(work_dir, 'dump.jsonl')
+        make_dump(dump_path, [item[0] for item in item_list], options.dump_share)
+
+        SlowMemorySource.delay = options.custom_delay
+        app.register_price_source('memory', SlowMemorySource)
+
+        runs = [('site', 'site', 'priority'),
+                ('file', f'file:{dump_path}', 'priority'),
+                ('memory (user-defined)', 'memory', 'priority'),
+                ('site,file priority', f'site,file:{dump_path}', 'priority'),
+                ('site,file first', f'site,file:{dump_path}', 'first'),
+                ('site,file combined', f'site,file:{dump_path}', 'combined'),
+                ('file,site priority', f'file:{dump_path},site', 'priority')]
+
+        print(f'{options.items} items; stand-in latency {options.latency}s +/- {options.jitter}s, '
+              f'{options.workers} workers, dump covers {options.dump_share:.0%}')
+        print(f'{"Sources":<24} {"Seconds":>9} {"Items/sec":>12} {"Priced":>8} {"Requests":>9}')
+
+        for label, spec, policy in runs:
+            requests_before = server.requests
+            seconds, _, priced = common.measure(lambda: price_all(app, item_list, spec, policy), False)
+            print(f'{label:<24} {seconds:>9.3f} {len(item_list) / seconds:>12,.0f} {priced:>8.0%} '
+                  f'{server.requests - requests_before:>9}')
+
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
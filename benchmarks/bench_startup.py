@@ -0,0 +1,112 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import common
+
+
+# ----------------------------------------
+# ---------- start up benchmark ----------
+# ----------------------------------------
+
+# what each start up path does on top of loading the app
+# itself; headless is a plain import, batch adds what a batch
+# run pulls in, and gui loads the window libraries, then
+# builds the main window, draws it once and destroys it
+SCENARIOS = {'headless': '',
+             'batch': 'app.load_network(); app.load_numpy()',
+             'gui': 'app.load_gui(); app.load_network(); app.load_numpy(); '
+                    'app.build_main_window(); app.app.update(); app.app.destroy()'}
+
+
+# build the python code that loads the app for a scenario
+def scenario_code(scenario):
+    bench_dir = os.path.dirname(os.path.abspath(__file__))
+
+    return (f'import sys, tempfile; sys.path.insert(0, {bench_dir!r}); import common; '
+            f'app = common.load_app(tempfile.gettempdir()); {SCENARIOS[scenario]}')
+
+
+# run python code in a fresh interpreter and return its wall
+# time and stderr; pycache_dir holds the bytecode cache, so a
+# new directory makes a cold start (every module compiled)
+def run_python(code, pycache_dir, options=()):
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache_dir)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, *options, '-c', code], env=env,
+                            capture_output=True, text=True, check=True)
+
+    return time.perf_counter() - start, result.stderr
+
+
+# check whether tk can open a window here; without a display,
+# the gui scenario is skipped
+def has_display():
+    result = subprocess.run([sys.executable, '-c', 'import tkinter; tkinter.Tk().destroy()'],
+                            capture_output=True)
+
+    return result.returncode == 0
+
+
+# sum -X importtime output by top level import; returns a
+# list of (cumulative microseconds, module name), slowest first
+def top_level_imports(importtime_output):
+    imports = []
+
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        _, cumulative, name = line[len('import time:'):].split('|')
+
+        # nested imports are indented under their parent
+        if not name[1:].startswith(' '):
+            imports.append((int(cumulative), name.strip()))
+
+    return sorted(imports, reverse=True)
+
+
+# time the cold and warm start of each scenario, then
+# break each one down by import
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Auction Builder start up time.')
+    parser.add_argument('--runs', type=int, default=5, help='warm starts to time for each scenario')
+    parser.add_argument('--top', type=int, default=10, help='imports to list in the breakdown')
+    options = parser.parse_args()
+    scenarios = [scenario for scenario in SCENARIOS if scenario != 'gui' or has_display()]
+
+    if 'gui' not in scenarios:
+        print('no display found; skipping the gui scenario')
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        pycache_dir = os.path.join(work_dir, 'pycache')
+        # the interpreter's own start up, to subtract from the rest
+        run_python('pass', pycache_dir)
+        baseline = statistics.median(run_python('pass', pycache_dir)[0] for _ in range(options.runs))
+
+        print(f'python start up: {baseline:.3f}s (subtracted below); app: {common.APP_PATH}')
+        print(f'{"Scenario":<12} {"Cold":>9} {"Warm":>9} {"Warm min":>9}')
+
+        for scenario in scenarios:
+            scenario_dir = os.path.join(work_dir, scenario)
+            cold = run_python(scenario_code(scenario), scenario_dir)[0]
+            warm = [run_python(scenario_code(scenario), scenario_dir)[0] for _ in range(options.runs)]
+            print(f'{scenario:<12} {cold - baseline:>9.3f} {statistics.median(warm) - baseline:>9.3f} '
+                  f'{min(warm) - baseline:>9.3f}')
+
+        for scenario in scenarios:
+            _, output = run_python(scenario_code(scenario), os.path.join(work_dir, scenario),
+                                   ['-X', 'importtime'])
+            print(f'\n-X importtime, {scenario} (warm), top {options.top} imports:')
+            print(f'{"Module":<32} {"Seconds":>9}')
+
+            for cumulative, name in top_level_imports(output)[:options.top]:
+                print(f'{name:<32} {cumulative / 1000000:>9.3f}')
+
+
+if __name__ == '__main__':
+    main()
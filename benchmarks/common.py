@@ -0,0 +1,234 @@
+import importlib.util
+import http.server
+import os
+import random
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+import urllib.parse
+import zlib
+
+
+# ----------------------------------------
+# ---------- shared bench helpers --------
+# ----------------------------------------
+
+# the app lives in a script with a dash in its name, so
+# it has to be loaded from its path rather than imported
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Auction-Builder.py')
+
+# words used to make up synthetic item names
+NAME_WORDS = ['Bone', 'Chips', 'Rat', 'Whiskers', 'Fire', 'Beetle', 'Eye', 'Silk', 'Cloth', 'Bronze',
+              'Dagger', 'Ruby', 'Pearl', 'Jade', 'Ring', 'Cloak', 'Shadow', 'Sword', 'Shield', 'Ore',
+              'Velium', 'Mithril', 'Spider', 'Venom', 'Lizard', 'Skull', 'Crown', 'Gloves', 'Boots', 'Wolf']
+
+
+# load Auction-Builder.py as a module named auction_builder,
+# without building its window, and keep its files (price
+# cache, last import) inside work_dir
+def load_app(work_dir):
+    spec = importlib.util.spec_from_file_location('auction_builder', APP_PATH)
+    app = importlib.util.module_from_spec(spec)
+    sys.modules['auction_builder'] = app
+    spec.loader.exec_module(app)
+
+    app.CACHE_FILE = os.path.join(work_dir, 'price_cache.db')
+    app.LAST_IMPORT_FILE = os.path.join(work_dir, 'last_import')
+    app.auctions_count = '15'
+    app.hotkey_page = '2'
+    app.hotkey_button = '1'
+
+    return app
+
+
+# make a copy of the app's settings defaults inside work_dir;
+# headless entry points read 'settings' from the current
+# directory
+def write_settings(work_dir, outputfile, mule_ini, workers=8):
+    with open(os.path.join(work_dir, 'settings'), 'w') as file:
+        file.write('[config]')
+        file.write('\npage=2')
+        file.write('\nbutton=1')
+        file.write('\nauctions=15')
+        file.write(f'\nworkers={workers}')
+        file.write(f'\noutputfile={outputfile}')
+        file.write(f'\nmule_ini={mule_ini}')
+        file.write('\n[exclusions]')
+        file.write('\nBone Chips')
+
+
+# build a list of unique synthetic item names and ids
+def make_item_names(count, seed=1):
+    rng = random.Random(seed)
+    names = {}
+
+    while len(names) < count:
+        name = ' '.join(rng.sample(NAME_WORDS, rng.randint(1, 4)))
+        names[name] = str(rng.randint(1001, 99999))
+
+    return list(names.items())
+
+
+# write a zeal outputfile with the given number of lines,
+# drawing from unique_items distinct items and mixing in
+# the bank, currency, empty and container lines that the
+# parser has to filter out
+def make_outputfile(path, lines, unique_items, seed=1):
+    rng = random.Random(seed)
+    items = make_item_names(unique_items, seed)
+
+    with open(path, 'w', newline='\r\n') as file:
+        file.write('Location\tName\tID\tCount\tSlots\n')
+
+        for line in range(lines):
+            roll = rng.random()
+
+            if roll < 0.05:
+                file.write(f'General{line % 8 + 1}\tBackpack\t17005\t1\t8\n')
+            elif roll < 0.10:
+                file.write(f'General{line % 8 + 1}-Slot{line % 8 + 1}\tEmpty\t0\t0\t0\n')
+            elif roll < 0.12:
+                file.write('Currency\tCurrency\t0\t1\t0\n')
+            elif roll < 0.20:
+                file.write(f'Bank{line % 8 + 1}\tBone Chips\t13073\t20\t0\n')
+            else:
+                name, item_id = items[rng.randrange(len(items))]
+                file.write(f'General{line % 8 + 1}-Slot{line % 10 + 1}\t{name}\t{item_id}\t1\t0\n')
+
+
+# write a character ini file with a few sections, and
+# existing socials on other pages that must survive
+def make_ini(path, socials=100):
+    with open(path, 'w') as file:
+        file.write('[Defaults]\nVideoModeBitsPerPixel=32\n[Chat]\nFontSize=3\n')
+        file.write('[Socials]\n')
+
+        for social in range(socials):
+            page = social // 12 % 9 + 3
+            button = social % 12 + 1
+            file.write(f'Page{page}Button{button}Name=Social{social}\n')
+            file.write(f'Page{page}Button{button}Line1=/say hello {social}\n')
+
+        file.write('[Hotbuttons]\nPage1Button1=1\n')
+
+
+# ----------------------------------------
+# ------- local auction site stand-in ----
+# ----------------------------------------
+
+# serve item pages shaped like eqtunnelauctions.com's, with
+# a few tens of kilobytes of html around the chart data
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        query = urllib.parse.urlparse(self.path).query
+        item_string = urllib.parse.parse_qs(query).get('itemstr', [''])[0]
+        rng = random.Random(zlib.crc32(item_string.encode()))
+
+        # simulate network and server latency
+        time.sleep(max(0.0, server.latency + random.uniform(-server.jitter, server.jitter)))
+
+        with server.stats_lock:
+            server.requests += 1
+
+        if random.random() < server.error_rate:
+            self.send_error(random.choice([429, 503]))
+            return
+
+        # each item has a fixed price level, with a few outliers
+        if rng.random() < server.unknown_rate:
+            data = ''
+        else:
+            level = rng.randint(1, 400) * 25
+            prices = [level + rng.randint(-level // 4, level // 4) for _ in range(rng.randint(1, 60))]
+
+            if len(prices) > 3:
+                prices[rng.randrange(len(prices))] *= 50
+
+            data = 'data: [' + ','.join(f'"{price}"' for price in prices) + '],'
+
+        page = (f'<html><head><title>{item_string}</title></head><body>{server.padding}'
+                f'<script>var chart = {{ series: [{{ {data} }}] }};</script>{server.padding}</body></html>')
+        body = page.encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # streaming clients hang up once they have the data
+            return
+
+        with server.stats_lock:
+            server.bytes_sent += len(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# start a stand-in site on a free local port in a background
+# thread; returns the server, whose url attribute is the base
+# address to give the app
+def start_stand_in(latency=0.05, jitter=0.02, error_rate=0.0, unknown_rate=0.1, padding_kb=40):
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.jitter = jitter
+    server.error_rate = error_rate
+    server.unknown_rate = unknown_rate
+    server.padding = '<div class="filler">' + 'x' * (padding_kb * 1024) + '</div>'
+    server.requests = 0
+    server.bytes_sent = 0
+    server.stats_lock = threading.Lock()
+    server.url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+# ----------------------------------------
+# -------------- measurement -------------
+# ----------------------------------------
+
+# run func and return (seconds, peak traced bytes, result);
+# the timing run is untraced, since tracemalloc slows down
+# python code, and peak memory comes from a second run
+# unless memory is False
+def measure(func, memory=True):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = None
+
+    if memory:
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return elapsed, peak, result
+
+
+# print one row of a results table
+def print_row(stage, seconds, items, peak):
+    rate = f'{items / seconds:,.0f}' if seconds > 0 else '-'
+    memory = f'{peak / (1024 * 1024):.1f}' if peak is not None else '-'
+    print(f'{stage:<34} {seconds:>9.4f} {items:>8} {rate:>12} {memory:>9}')
+
+
+# print the header of a results table
+def print_header():
+    print(f'{"Stage":<34} {"Seconds":>9} {"Items":>8} {"Items/sec":>12} {"Peak MB":>9}')
+
+
+# copy a file, so each timed run starts from the same input
+def fresh_copy(source, target):
+    shutil.copyfile(source, target)
+
+    return target